@@ -0,0 +1,269 @@
+"""Model dosyaları için doğrulamalı, takılabilir (yerel dizin / HTTP) artifact deposu.
+
+Dosyalar her zaman önce '<dosya>.part' geçici dosyasına yazılır, SHA-256 manifestine göre doğrulanır
+ve ancak ondan sonra atomik olarak (os.replace) asıl adına taşınır. Böylece yarıda kesilen bir indirme
+asla geçerli bir model dosyası gibi görünmez; bir sonraki başlatmada '.part' dosyasından devam edilir.
+
+Doğrulanan dosyalar için '<dosya>.verified' damgası (sha256, boyut, mtime) yazılır; dosya değişmediyse
+sonraki başlatmalarda büyük dosyanın tekrar hash'lenmesine gerek kalmaz. Manifestte checksum'ı olmayan
+bir dosyaya yalnızca bu damga (boyut ve mtime eşleşiyorsa) varsa güvenilir; aksi halde dosya yeniden alınır.
+
+Manifesti güncellemek için:
+    python artifact_store.py --write-manifest
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+
+import requests
+
+MANIFEST_PATH = "artifact_manifest.json"
+
+# Ortam değişkeni ile kaynak seçilir: yerel bir dizin veya http(s) taban adresi
+ARTIFACT_SOURCE_ENV = "ENERGY_ARTIFACT_SOURCE"
+
+# Büyük parçalar sistem çağrısı ve Python döngüsü maliyetini azaltır (eski kod 8 KB kullanıyordu)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class ArtifactError(Exception):
+    """Artifact indirilemediğinde veya doğrulanamadığında fırlatılır."""
+
+
+def sha256_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Manifesti {dosya_adı: {"sha256": ..., "url": ...}} sözlüğü olarak okur; yoksa boş döner."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('artifacts', {})
+
+
+def _stamp_path(path):
+    return path + '.verified'
+
+
+def _write_stamp(path, sha256):
+    stat = os.stat(path)
+    with open(_stamp_path(path), 'w', encoding='utf-8') as f:
+        json.dump({'sha256': sha256, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}, f)
+
+
+def _read_stamp(path):
+    try:
+        with open(_stamp_path(path), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_verified(path, expected_sha256):
+    """Dosya mevcut ve beklenen checksum ile eşleşiyorsa True döner (damga geçerliyse hash'lemeden).
+
+    Manifestte checksum yoksa yalnızca _finalize'ın yazdığı damgası boyut ve mtime ile eşleşen dosyaya
+    güvenilir; damgasız (ör. eski kodla indirilmiş, yarım kalmış) dosya yeniden alınır.
+    """
+    if not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    stamp = _read_stamp(path)
+    if stamp.get('size') == stat.st_size and stamp.get('mtime_ns') == stat.st_mtime_ns:
+        if expected_sha256 is None or stamp.get('sha256') == expected_sha256:
+            return True
+    if expected_sha256 is None:
+        return False
+    if sha256_file(path) == expected_sha256:
+        _write_stamp(path, expected_sha256)
+        return True
+    return False
+
+
+def cached_sha256(path):
+    """Dosyanın SHA-256'sı: geçerli bir damga varsa ondan okunur, yoksa hash'lenir ve süreç içinde önbelleğe alınır.
+
+    Damga burada yazılmaz: is_verified checksum'sız dosyalara yalnızca _finalize'ın damgasıyla güvenir.
+    """
+    stat = os.stat(path)
+    stamp = _read_stamp(path)
+    if stamp.get('sha256') and stamp.get('size') == stat.st_size and stamp.get('mtime_ns') == stat.st_mtime_ns:
+        return stamp['sha256']
+    return _sha256_for_signature(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _sha256_for_signature(path, size, mtime_ns):
+    return sha256_file(path)
+
+
+def _finalize(part_path, dest_path, expected_sha256, actual_sha256):
+    if expected_sha256 is not None and actual_sha256 != expected_sha256:
+        os.remove(part_path)
+        raise ArtifactError(f"'{dest_path}' için checksum eşleşmedi (beklenen {expected_sha256}, gelen {actual_sha256}).")
+    os.replace(part_path, dest_path)
+    _write_stamp(dest_path, actual_sha256)
+
+
+class LocalDirectoryStore:
+    """Artifact'ları yerel (veya ağdan bağlanmış) bir dizinden kopyalar."""
+
+    def __init__(self, root, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.root = root
+        self.chunk_size = chunk_size
+
+    def fetch(self, name, dest_path, expected_sha256=None, url=None):
+        src_path = os.path.join(self.root, name)
+        if not os.path.exists(src_path):
+            raise ArtifactError(f"'{src_path}' dosyası bulunamadı.")
+        if os.path.abspath(src_path) == os.path.abspath(dest_path):
+            if expected_sha256 is None:
+                # Kaynak dizinin kendisi: karşılaştırılacak başka kopya yok, dosya olduğu gibi damgalanır
+                _write_stamp(dest_path, sha256_file(dest_path))
+            elif not is_verified(dest_path, expected_sha256):
+                raise ArtifactError(f"'{dest_path}' için checksum eşleşmedi.")
+            return dest_path
+
+        part_path = dest_path + '.part'
+        digest = hashlib.sha256()
+        with open(src_path, 'rb') as src, open(part_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(self.chunk_size), b''):
+                digest.update(chunk)
+                dst.write(chunk)
+        _finalize(part_path, dest_path, expected_sha256, digest.hexdigest())
+        return dest_path
+
+
+class HttpStore:
+    """Artifact'ları genel bir HTTP(S) kaynağından büyük parçalarla, kaldığı yerden devam ederek indirir.
+
+    base_url verildiyse base_url + dosya adı, verilmediyse manifestteki 'url' kullanılır.
+    """
+
+    def __init__(self, base_url=None, chunk_size=DEFAULT_CHUNK_SIZE, timeout=60, session=None):
+        self.base_url = base_url.rstrip('/') + '/' if base_url else None
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def fetch(self, name, dest_path, expected_sha256=None, url=None):
+        url = self.base_url + name if self.base_url else url
+        if url is None:
+            raise ArtifactError(f"'{name}' için indirme adresi tanımlı değil.")
+
+        part_path = dest_path + '.part'
+        resumed = os.path.exists(part_path)
+        actual_sha256, range_exhausted = self._download(url, part_path)
+        if expected_sha256 is not None:
+            valid = actual_sha256 == expected_sha256
+        else:
+            # Checksum yokken 416 ile "tamamlandı" denen yarım dosya doğrulanamaz
+            valid = not range_exhausted
+        if resumed and not valid:
+            # Devam edilen '.part' bozuk veya doğrulanamıyor: silinip bir kez baştan indirilir
+            os.remove(part_path)
+            actual_sha256, _ = self._download(url, part_path)
+        _finalize(part_path, dest_path, expected_sha256, actual_sha256)
+        return dest_path
+
+    def _download(self, url, part_path):
+        """'.part' dosyasını tamamlar; (sha256, sunucu 416 döndürdü mü) döner."""
+        digest = hashlib.sha256()
+        offset = 0
+        if os.path.exists(part_path):
+            # Yarım kalan indirmenin hash'ini güncelle ve kalan kısmı Range ile iste
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                    digest.update(chunk)
+                    offset += len(chunk)
+
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        try:
+            with self.session.get(url, stream=True, headers=headers, timeout=self.timeout) as response:
+                if offset and response.status_code == 416:
+                    # Sunucuya göre dosya zaten tamamen indirilmiş; çağıran yine de checksum'ı doğrular
+                    return digest.hexdigest(), True
+                response.raise_for_status()
+                if 'text/html' in response.headers.get('Content-Type', ''):
+                    raise ArtifactError(f"'{url}' dosya yerine bir HTML sayfası döndürdü.")
+                if offset and response.status_code != 206:
+                    # Sunucu Range desteklemiyor: baştan indir
+                    digest = hashlib.sha256()
+                    offset = 0
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        digest.update(chunk)
+                        f.write(chunk)
+        except requests.exceptions.RequestException as e:
+            raise ArtifactError(f"'{url}' indirilemedi: {e}") from e
+        return digest.hexdigest(), False
+
+
+def store_from_source(source=None):
+    """Kaynak tanımından (dizin yolu veya http(s) adresi) uygun depoyu oluşturur."""
+    source = source if source is not None else os.environ.get(ARTIFACT_SOURCE_ENV)
+    if source and source.startswith(('http://', 'https://')):
+        return HttpStore(source)
+    if source:
+        return LocalDirectoryStore(source)
+    # Kaynak verilmediyse yalnızca manifestteki url'ler kullanılır
+    return HttpStore()
+
+
+def ensure_artifacts(names, base_dir='.', store=None, manifest=None):
+    """Verilen dosyaları base_dir altında hazır ve doğrulanmış hale getirir; indirilen dosyaların listesini döner."""
+    store = store or store_from_source()
+    manifest = manifest if manifest is not None else load_manifest(os.path.join(base_dir, MANIFEST_PATH))
+    fetched = []
+    for name in names:
+        entry = manifest.get(name, {})
+        expected_sha256 = entry.get('sha256')
+        dest_path = os.path.join(base_dir, name)
+        if is_verified(dest_path, expected_sha256):
+            continue
+        # Checksum'ı tutmayan (ör. eski, yarım indirilmiş) dosya, yenisi doğrulanınca atomik olarak değiştirilir
+        store.fetch(name, dest_path, expected_sha256=expected_sha256, url=entry.get('url'))
+        fetched.append(name)
+    return fetched
+
+
+def write_manifest(names, base_dir='.', path=MANIFEST_PATH):
+    """Mevcut dosyaların checksum'larını manifeste yazar (mevcut url alanları korunur)."""
+    manifest_path = os.path.join(base_dir, path)
+    artifacts = load_manifest(manifest_path)
+    for name in names:
+        file_path = os.path.join(base_dir, name)
+        if os.path.exists(file_path):
+            artifacts.setdefault(name, {})['sha256'] = sha256_file(file_path)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'artifacts': artifacts}, f, indent=2)
+        f.write('\n')
+    return artifacts
+
+
+def main():
+    from model_resources import MANIFEST_JOBLIBS, REQUIRED_JOBLIBS
+
+    parser = argparse.ArgumentParser(description="Model artifact'larını indir / doğrula")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--source', default=None, help=f"Yerel dizin veya http(s) adresi (varsayılan: ${ARTIFACT_SOURCE_ENV})")
+    parser.add_argument('--write-manifest', action='store_true', help="Mevcut dosyaların checksum'larını manifeste yaz")
+    args = parser.parse_args()
+
+    if args.write_manifest:
+        write_manifest(MANIFEST_JOBLIBS, args.base_dir)
+        print(f"'{MANIFEST_PATH}' güncellendi.")
+        return
+    fetched = ensure_artifacts(REQUIRED_JOBLIBS, args.base_dir, store=store_from_source(args.source))
+    print(f"İndirilen dosyalar: {', '.join(fetched) if fetched else 'yok (tümü doğrulandı)'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+# Toplu tahmin dosyasında bulunması gereken ham giriş sütunları
+BATCH_INPUT_COLUMNS = ['current', 'voltage', 'temp', 'pressure', 'humidity', 'speed', 'deg', 'description']
+
+# Model tahmini bu kadar satırlık parçalar halinde yapılır (bellek kullanımını sınırlamak için)
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def read_batch_file(uploaded_file):
+    """Yüklenen CSV veya Parquet dosyasını DataFrame olarak okur."""
+    name = getattr(uploaded_file, 'name', str(uploaded_file)).lower()
+    if name.endswith('.parquet') or name.endswith('.pq'):
+        df = pd.read_parquet(uploaded_file)
+    else:
+        df = pd.read_csv(uploaded_file)
+
+    missing = [col for col in BATCH_INPUT_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Dosyada eksik sütunlar var: {', '.join(missing)}")
+    return df
+
+
+def encode_batch(df, encoder):
+    """Tüm satırları tek seferde one-hot kodlar ve sayısal özellikleri ölçeklendirir."""
+    return encoder.to_frame(encoder.encode_frame(df))
+
+
+def predict_in_chunks(model, X, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Modeli sabit boyutlu parçalar üzerinde çalıştırır ve tahminleri birleştirir."""
+    n_rows = len(X)
+    predictions = np.empty(n_rows, dtype=np.float64)
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        predictions[start:stop] = model.predict(X.iloc[start:stop])
+    return predictions
+
+
+def predict_in_chunks_cached(cache, matrix, chunk_size=DEFAULT_CHUNK_SIZE):
+    """predict_in_chunks ile aynı, ancak her parça önce tahmin önbelleğinden geçer."""
+    predictions = np.empty(len(matrix), dtype=np.float64)
+    for start in range(0, len(matrix), chunk_size):
+        predictions[start:start + chunk_size] = cache.predict_matrix(matrix[start:start + chunk_size])
+    return predictions
+
+
+def run_batch_prediction(df, model, encoder, chunk_size=DEFAULT_CHUNK_SIZE, cache=None):
+    """Dosyanın tamamı için tahmin yapar; sonuç tablosunu ve süre istatistiklerini döner."""
+    start_time = time.perf_counter()
+
+    final_input = encode_batch(df, encoder)
+    encode_seconds = time.perf_counter() - start_time
+
+    if cache is not None:
+        predictions = predict_in_chunks_cached(cache, final_input.to_numpy(), chunk_size=chunk_size)
+    else:
+        predictions = predict_in_chunks(model, final_input, chunk_size=chunk_size)
+    total_seconds = time.perf_counter() - start_time
+
+    result = df[BATCH_INPUT_COLUMNS].copy()
+    result['predicted_active_power'] = predictions
+
+    n_rows = len(df)
+    stats = {
+        'rows': n_rows,
+        'encode_seconds': encode_seconds,
+        'total_seconds': total_seconds,
+        'rows_per_second': n_rows / total_seconds if total_seconds > 0 else float('inf'),
+    }
+    return result, stats
+
+
+def iter_csv_bytes(result, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Sonuç tablosunu parça parça CSV baytlarına dönüştürür."""
+    if len(result) == 0:
+        yield result.to_csv(index=False).encode('utf-8')
+        return
+    for start in range(0, len(result), chunk_size):
+        buffer = io.StringIO()
+        result.iloc[start:start + chunk_size].to_csv(buffer, index=False, header=(start == 0))
+        yield buffer.getvalue().encode('utf-8')
+
+
+def write_csv(result, file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Sonuç tablosunu parça parça ikili bir dosyaya yazar; tüm CSV hiçbir zaman tek bir bytes nesnesinde birleşmez."""
+    for data in iter_csv_bytes(result, chunk_size=chunk_size):
+        file.write(data)
+    file.flush()
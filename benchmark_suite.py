@@ -0,0 +1,382 @@
+"""Tahmin yolunun performans ölçümleri ve JSON taban çizgisine göre gerileme kontrolü.
+
+Ölçülen aşamalar (her biri satır/sn verimi olarak raporlanır):
+    artifact_load/<dosya>        joblib dosyalarının yüklenmesi (mmap kopyası varsa o kullanılır)
+    encode/<n>                   FeatureEncoder.encode_arrays (one-hot + ölçekleme, n satır)
+    scale/<n>                    yalnızca sayısal sütunların ölçeklenmesi
+    predict/<n>                  stacking modeli predict (varsayılan 1 ... 1.000.000 satır)
+    app_handler/miss, /hit       uygulamadaki 'Aktif Güç Tahmin Et' butonunun işlediği yol
+                                 (encode_row + PredictionCache), önbellek kaçırma ve isabet durumları
+    app_rerun                    Streamlit AppTest ile tahmin sayfasının butona basılarak yeniden çalıştırılması
+                                 (--app verilirse)
+
+Girdiler all_descriptions'tan ve gerçekçi sayısal aralıklardan sabit tohumla üretilir.
+
+Her ölçüm en az DEFAULT_MIN_REPEATS tekrar ve DEFAULT_MIN_SECONDS süre ile yapılır; medyan süre ve gürültü
+(göreli çeyrekler arası açıklık) kaydedilir. Verim, taban çizgisine göre hem eşikten hem de gürültü bandından
+fazla düşerse ölçüm yeniden yapılır; gerileme ancak tekrarlarda da sürerse raporlanır. Gürültü bandı eşiğin
+MAX_TOLERANCE_FACTOR katını aşamaz; gürültüsü MAX_RELIABLE_NOISE'u aşan ölçümler güvenilmez olarak listelenir.
+
+Kullanım:
+    python benchmark_suite.py --save-baseline                  # benchmark_baseline.json
+    python benchmark_suite.py --baseline benchmark_baseline.json --threshold 0.15   # gerileme varsa çıkış kodu 1
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+from model_resources import MODEL_PATH, REQUIRED_JOBLIBS, artifact_dir, load_artifacts, load_joblib
+
+DEFAULT_BASELINE_PATH = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+# Her ölçüm en az bu kadar tekrar ve bu kadar toplam süre ile yapılır; sonuç tekrarların medyanıdır
+DEFAULT_MIN_REPEATS = 5
+DEFAULT_MIN_SECONDS = 0.5
+# Tek bir örneğin en kısa süresi; daha hızlı çağrılar bir örnekte art arda tekrarlanır
+MIN_SAMPLE_SECONDS = 0.002
+# Verim düşüşü, iki ölçümün toplam gürültüsünün (göreli çeyrekler arası açıklık) bu katını da aşmalıdır
+NOISE_FACTOR = 2.0
+# Gürültü bandı eşiğin bu katıyla sınırlıdır: çok gürültülü ölçümde bile büyük düşüşler gerileme sayılır
+MAX_TOLERANCE_FACTOR = 2.0
+# Gürültüsü bunu aşan ölçümler raporda güvenilmez olarak işaretlenir
+MAX_RELIABLE_NOISE = 0.10
+# Gerileme şüphesi olan ölçüm, raporlanmadan önce en fazla bu kadar kez yeniden ölçülür
+DEFAULT_CONFIRM_RERUNS = 2
+
+# Ham veri setindeki tipik aralıklar
+NUMERIC_RANGES = {
+    'current': (0.5, 8.0),
+    'voltage': (110.0, 135.0),
+    'temp': (-5.0, 40.0),
+    'pressure': (995.0, 1035.0),
+    'humidity': (10.0, 100.0),
+    'speed': (0.0, 12.0),
+    'deg': (0.0, 360.0),
+}
+
+
+def synthetic_inputs(numerical_features, all_descriptions, n_rows, seed=42):
+    """(n, 7) sayısal değer matrisi ve all_descriptions'tan seçilmiş açıklama dizisi üretir."""
+    rng = np.random.default_rng(seed)
+    values = np.column_stack([rng.uniform(*NUMERIC_RANGES[name], n_rows) for name in numerical_features])
+    descriptions = np.asarray(all_descriptions, dtype=object)[rng.integers(len(all_descriptions), size=n_rows)]
+    return values, descriptions
+
+
+def _calibrate(fn, min_sample_seconds):
+    """Bir örneğin en az min_sample_seconds sürmesi için gereken çağrı sayısı (ısınma turu yerine geçer)."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_seconds or number >= 1_000_000:
+            return number
+        number *= 10 if elapsed < min_sample_seconds / 10 else 2
+
+
+def sample_call(fn, min_repeats=DEFAULT_MIN_REPEATS, min_seconds=DEFAULT_MIN_SECONDS, max_repeats=1000, warmup=True):
+    """fn'i en az min_repeats örnek ve toplam en az min_seconds boyunca ölçer; çağrı başına süreleri döner.
+
+    Mikro saniyelik çağrılarda zamanlayıcı gürültüsü baskın olmasın diye her örnek, en az
+    MIN_SAMPLE_SECONDS sürecek kadar art arda çağrının ortalamasıdır (timeit gibi). warmup=False ise
+    (tek çağrısı saniyeler süren büyük partiler) ısınma ve kalibrasyon yapılmaz.
+    """
+    number = _calibrate(fn, MIN_SAMPLE_SECONDS) if warmup else 1
+    durations = []
+    started = time.perf_counter()
+    while len(durations) < max_repeats and (len(durations) < min_repeats or time.perf_counter() - started < min_seconds):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        durations.append((time.perf_counter() - start) / number)
+    return durations
+
+
+def time_call(fn, min_repeats=DEFAULT_MIN_REPEATS, min_seconds=DEFAULT_MIN_SECONDS, max_repeats=1000, warmup=True):
+    """sample_call ile ölçer; (medyan süre, tekrar sayısı) döner."""
+    durations = sample_call(fn, min_repeats, min_seconds, max_repeats, warmup)
+    return statistics.median(durations), len(durations)
+
+
+def _result(durations, rows):
+    """Medyan süre, verim ve gürültü (çeyrekler arası açıklığın medyana oranı)."""
+    seconds = statistics.median(durations)
+    if len(durations) >= 4:
+        q1, _, q3 = statistics.quantiles(durations, n=4)
+        noise = (q3 - q1) / seconds if seconds else 0.0
+    else:
+        noise = (max(durations) - min(durations)) / seconds if seconds else 0.0
+    return {'seconds': seconds, 'rows': rows, 'rows_per_second': rows / seconds if seconds else float('inf'),
+            'repeats': len(durations), 'noise': noise}
+
+
+# Her ölçüm bir Case'tir: setup() ölçülecek fonksiyonu hazırlar (girdiler yalnızca o ölçüm sürerken bellekte
+# tutulur); gerileme şüphesinde aynı Case yeniden ölçülür.
+Case = namedtuple('Case', ['setup', 'rows', 'min_repeats', 'warmup'], defaults=[DEFAULT_MIN_REPEATS, True])
+
+
+def measure(case, min_seconds=DEFAULT_MIN_SECONDS):
+    return _result(sample_call(case.setup(), case.min_repeats, min_seconds, warmup=case.warmup), case.rows)
+
+
+def artifact_load_cases(base_dir, model_path=MODEL_PATH):
+    return {f'artifact_load/{name}': Case(lambda name=name: lambda: load_joblib(base_dir, name), 1)
+            for name in [model_path if filename == MODEL_PATH else filename for filename in REQUIRED_JOBLIBS]}
+
+
+def encoding_cases(encoder, all_descriptions, batch_sizes):
+    def encode_setup(n):
+        values, descriptions = synthetic_inputs(encoder.numerical_features, all_descriptions, n)
+        out = encoder.allocate(n)
+        return lambda: encoder.encode_arrays(values, descriptions, out=out)
+
+    def scale_setup(n):
+        values, _ = synthetic_inputs(encoder.numerical_features, all_descriptions, n)
+        return lambda: (values - encoder.mean) / encoder.scale
+
+    cases = {}
+    for n in batch_sizes:
+        cases[f'encode/{n}'] = Case(lambda n=n: encode_setup(n), n)
+        cases[f'scale/{n}'] = Case(lambda n=n: scale_setup(n), n)
+    return cases
+
+
+def predict_cases(model, encoder, all_descriptions, batch_sizes):
+    def setup(n):
+        values, descriptions = synthetic_inputs(encoder.numerical_features, all_descriptions, n)
+        frame = encoder.to_frame(encoder.encode_arrays(values, descriptions))
+        return lambda: model.predict(frame)
+
+    # Büyük partilerde ısınma turu atlanır (tek çağrı saniyeler sürebilir); tekrar sayısı yine en az DEFAULT_MIN_REPEATS
+    return {f'predict/{n}': Case(lambda n=n: setup(n), n, warmup=n < 100_000) for n in batch_sizes}
+
+
+def app_handler_cases(artifacts, n_requests=200):
+    """Uygulamanın buton işleyicisi: encode_row + PredictionCache.predict_matrix."""
+    from prediction_cache import PredictionCache
+
+    model, encoder = artifacts.model, artifacts.encoder
+    values, descriptions = synthetic_inputs(encoder.numerical_features, artifacts.all_descriptions, n_requests)
+    rows = [(*row, description) for row, description in zip(values.tolist(), descriptions)]
+
+    def new_cache():
+        return PredictionCache(lambda m: model.predict(encoder.to_frame(m)), encoder)
+
+    def run_all(cache):
+        for row in rows:
+            cache.predict_matrix(encoder.encode_row(*row))[0]
+
+    def warm_setup():
+        # İsabet: önbellek önceden doldurulmuş
+        warm = new_cache()
+        run_all(warm)
+        return lambda: run_all(warm)
+
+    return {
+        # Kaçırma: her turda boş önbellek, tüm istekler modele gider
+        'app_handler/miss': Case(lambda: lambda: run_all(new_cache()), n_requests),
+        'app_handler/hit': Case(warm_setup, n_requests),
+    }
+
+
+def app_rerun_case(app_path='energy_prediction_streamlit_app.py', min_repeats=10):
+    """Streamlit AppTest ile tahmin sayfasında butona basılarak yapılan tam yeniden çalıştırmalar."""
+    def setup():
+        from streamlit.testing.v1 import AppTest
+
+        app = AppTest.from_file(app_path, default_timeout=600)
+        # Tahmin sayfası uygulamanın ?sayfa=tahmin bağlantısıyla açılır (sayfalar dosya değil fonksiyon olduğundan
+        # AppTest.switch_page kullanılamaz); sorgu parametresi sonraki çalıştırmalarda da korunur
+        app.query_params['sayfa'] = 'tahmin'
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"Uygulama hata verdi: {app.exception[0].message}")
+
+        def click():
+            next(b for b in app.button if 'Tahmin Et' in b.label).click().run()
+        return click
+
+    return {'app_rerun': Case(setup, 1, min_repeats)}
+
+
+def library_versions():
+    """Tahmin ve eğitim sonuçlarını etkileyen kütüphanelerin sürümleri."""
+    import joblib
+    import lightgbm
+    import pandas
+    import sklearn
+    import xgboost
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'scikit-learn': sklearn.__version__,
+        'joblib': joblib.__version__,
+        'lightgbm': lightgbm.__version__,
+        'xgboost': xgboost.__version__,
+    }
+
+
+def environment():
+    return {
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        **library_versions(),
+    }
+
+
+def suite_cases(base_dir='.', model_path=MODEL_PATH, batch_sizes=DEFAULT_BATCH_SIZES, include_app=False):
+    """Ölçüm adı -> Case sözlüğü (raporlama sırasıyla)."""
+    base_dir = artifact_dir(base_dir) if model_path == MODEL_PATH else base_dir
+    cases = artifact_load_cases(base_dir, model_path)
+    artifacts = load_artifacts(base_dir, model_path=model_path)
+    cases.update(encoding_cases(artifacts.encoder, artifacts.all_descriptions, batch_sizes))
+    cases.update(predict_cases(artifacts.model, artifacts.encoder, artifacts.all_descriptions, batch_sizes))
+    cases.update(app_handler_cases(artifacts))
+    if include_app:
+        cases.update(app_rerun_case())
+    return cases
+
+
+def run_suite(cases, min_seconds=DEFAULT_MIN_SECONDS):
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'results': {key: measure(case, min_seconds) for key, case in cases.items()},
+    }
+
+
+def tolerance(base, now, threshold=DEFAULT_THRESHOLD):
+    """İzin verilen verim düşüşü: threshold veya iki ölçümün toplam gürültüsünün NOISE_FACTOR katı (büyük olan),
+    en fazla threshold'un MAX_TOLERANCE_FACTOR katı."""
+    band = NOISE_FACTOR * (base.get('noise', 0.0) + now.get('noise', 0.0))
+    return min(max(threshold, band), MAX_TOLERANCE_FACTOR * threshold)
+
+
+def unreliable(current, baseline):
+    """Kendisi veya taban çizgisindeki karşılığı MAX_RELIABLE_NOISE'dan gürültülü ölçümlerin anahtarları."""
+    return [key for key, now in current['results'].items()
+            if max(now.get('noise', 0.0), baseline['results'].get(key, {}).get('noise', 0.0)) > MAX_RELIABLE_NOISE]
+
+
+def is_regression(base, now, threshold=DEFAULT_THRESHOLD):
+    return now['rows_per_second'] / base['rows_per_second'] < 1 - tolerance(base, now, threshold)
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Medyan verimi gürültü bandının ötesinde düşen ölçümlerin listesini döner."""
+    regressions = []
+    for key, base in baseline['results'].items():
+        now = current['results'].get(key)
+        if now is None:
+            continue
+        if is_regression(base, now, threshold):
+            regressions.append((key, base['rows_per_second'], now['rows_per_second'],
+                                now['rows_per_second'] / base['rows_per_second']))
+    return regressions
+
+
+def confirm_regressions(regressions, cases, current, baseline, threshold=DEFAULT_THRESHOLD,
+                        reruns=DEFAULT_CONFIRM_RERUNS, min_seconds=DEFAULT_MIN_SECONDS):
+    """Şüpheli ölçümleri yeniden ölçer; tekrarlarda da gerilemeye devam edenleri döner.
+
+    Tekrarlardan biri bile banda girerse ölçüm gürültü sayılır ve current'taki sonucu en iyi tekrarla değiştirilir.
+    """
+    confirmed = []
+    for key, base_rate, now_rate, ratio in regressions:
+        base = baseline['results'][key]
+        for _ in range(reruns):
+            rerun = measure(cases[key], min_seconds)
+            if rerun['rows_per_second'] > current['results'][key]['rows_per_second']:
+                current['results'][key] = rerun
+            if not is_regression(base, rerun, threshold):
+                break
+        else:
+            now = current['results'][key]
+            confirmed.append((key, base_rate, now['rows_per_second'], now['rows_per_second'] / base_rate))
+    return confirmed
+
+
+def print_report(current, baseline=None):
+    print(f"{'ölçüm':<44}{'süre (ms)':>12}{'gürültü':>9}{'satır/sn':>16}{'taban/sn':>16}{'oran':>8}")
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key) if baseline else None
+        base_text = f"{base['rows_per_second']:>16,.0f}{result['rows_per_second'] / base['rows_per_second']:>8.2f}" if base else ''
+        print(f"{key:<44}{result['seconds'] * 1000:>12.3f}{result.get('noise', 0.0):>9.1%}"
+              f"{result['rows_per_second']:>16,.0f}{base_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tahmin yolu performans ölçümleri ve gerileme kontrolü")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--model-path', default=MODEL_PATH)
+    parser.add_argument('--batch-sizes', default=','.join(str(n) for n in DEFAULT_BATCH_SIZES),
+                        help="Virgülle ayrılmış parti boyutları")
+    parser.add_argument('--app', action='store_true', help="Streamlit AppTest ile uçtan uca yeniden çalıştırmayı da ölç")
+    parser.add_argument('--baseline', default=None, help="Karşılaştırılacak JSON taban çizgisi")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="İzin verilen en fazla verim düşüşü (0.15 = %%15); gürültülü ölçümlerde bant genişler")
+    parser.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                        help="Her ölçümün en az süresi (sn)")
+    parser.add_argument('--confirm-reruns', type=int, default=DEFAULT_CONFIRM_RERUNS,
+                        help="Gerileme şüphesi olan ölçümün yeniden ölçülme sayısı")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE_PATH, default=None,
+                        help=f"Sonuçları taban çizgisi olarak yaz (varsayılan: {DEFAULT_BASELINE_PATH})")
+    parser.add_argument('--output', default=None, help="Sonuçları bu JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    batch_sizes = [int(n) for n in args.batch_sizes.split(',') if n]
+    cases = suite_cases(args.base_dir, args.model_path, batch_sizes, include_app=args.app)
+    current = run_suite(cases, args.min_seconds)
+
+    baseline = None
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} ölçümde gerileme şüphesi; yeniden ölçülüyor: "
+                  f"{', '.join(key for key, *_ in regressions)}")
+            regressions = confirm_regressions(regressions, cases, current, baseline, args.threshold,
+                                              args.confirm_reruns, args.min_seconds)
+    print_report(current, baseline)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+        print(f"Sonuçlar '{path}' dosyasına yazıldı.")
+
+    if baseline is not None:
+        changed = {key: (baseline['environment'].get(key), value) for key, value in current['environment'].items()
+                   if baseline['environment'].get(key) != value}
+        for key, (old, new) in changed.items():
+            print(f"Not: ortam farklı - {key}: {old} -> {new}")
+        noisy = unreliable(current, baseline)
+        if noisy:
+            print(f"\nUyarı: {len(noisy)} ölçüm güvenilmez (gürültü > %{MAX_RELIABLE_NOISE * 100:.0f}); bu ölçümlerde "
+                  f"ancak %{MAX_TOLERANCE_FACTOR * args.threshold * 100:.0f} üzeri düşüş yakalanır: {', '.join(noisy)}")
+        if regressions:
+            print(f"\nGERİLEME: {len(regressions)} ölçümde verim gürültü bandının ve %{args.threshold * 100:.0f} "
+                  f"eşiğinin ötesinde düştü ({args.confirm_reruns} tekrarda da sürdü):")
+            for key, base, now, ratio in regressions:
+                print(f"  {key}: {base:,.0f} -> {now:,.0f} satır/sn ({ratio:.2f}x)")
+            sys.exit(1)
+        print(f"\nGerileme yok (eşik %{args.threshold * 100:.0f}, gürültü bandı {NOISE_FACTOR:g}x, "
+              f"en fazla %{MAX_TOLERANCE_FACTOR * args.threshold * 100:.0f}).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""energy_weather_raw_data.csv'nin parça parça (bellek dışı) okunup sütunlu bir Parquet veri kümesine yazılması.
+
+Notebook tüm dosyayı pd.read_csv ile okuyup df[columns_to_keep], get_dummies, drop ve scaler adımlarında
+çerçevenin birden fazla tam kopyasını oluşturur. Burada CSV, chunk_size satırlık parçalar hâlinde ve
+sıkı veri tipleriyle okunur (sayısal sütunlar float32, 'description' kategori); her parça Parquet
+dosyasına ayrı bir satır grubu olarak yazılır ve StandardScaler istatistikleri partial_fit ile birikimli
+güncellenir. Tepe bellek kullanımı dosya boyutuna değil parça boyutuna bağlıdır.
+
+Veri kümesi dizini:
+    part-00000.parquet, ...   her ingest çağrısı yeni bir parça dosyası ekler; aynı kaynak dosya (ad, boyut,
+                              mtime) ikinci kez eklenmez (--force ile zorlanabilir)
+    dataset.json              satır sayısı, açıklamalar (ilk görülme sırasıyla), parça listesi
+    scaler.joblib             tüm satırlar üzerinde birikimli eğitilmiş StandardScaler
+
+Değerlendirme (evaluate_streaming) ve iter_batches veri kümesini parça parça okur; bellek parça boyutuyla
+sınırlıdır. Eğitim ise (load_encoded, training_pipeline --dataset) tüm satırların (n, n_özellik) float32
+matrisini bellekte kurar: bellek satır sayısıyla büyür (~n x özellik sayısı x 4 bayt). Büyük veri kümelerinde
+max_rows (training_pipeline --max-rows) ile rastgele bir alt örnek kullanılabilir.
+
+Kullanım:
+    python data_ingestion.py --csv energy_weather_raw_data.csv --dataset-dir energy_dataset --chunk-size 500000
+"""
+import argparse
+import json
+import os
+import resource
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sklearn.preprocessing import StandardScaler
+
+from feature_encoder import FeatureEncoder, description_column_name
+from model_resources import file_signature
+
+RAW_DATA_PATH = "energy_weather_raw_data.csv"
+DATASET_DIR = "energy_dataset"
+DATASET_META_PATH = "dataset.json"
+DATASET_SCALER_PATH = "scaler.joblib"
+DEFAULT_CHUNK_SIZE = 500_000
+
+TARGET = 'active_power'
+NUMERICAL_FEATURES = ['current', 'voltage', 'temp', 'pressure', 'humidity', 'speed', 'deg']
+COLUMNS_TO_KEEP = [TARGET] + NUMERICAL_FEATURES + ['description']
+
+RAW_DTYPES = {**{name: 'float32' for name in [TARGET] + NUMERICAL_FEATURES}, 'description': 'category'}
+
+# Parça dosyalarının ortak şeması; açıklama sözlük kodlamalı saklanır
+SCHEMA = pa.schema(
+    [(name, pa.float32()) for name in [TARGET] + NUMERICAL_FEATURES]
+    + [('description', pa.dictionary(pa.int32(), pa.string()))]
+)
+
+
+class DuplicateSourceError(Exception):
+    """Aynı kaynak dosya veri kümesine daha önce eklenmişse fırlatılır."""
+
+
+def load_meta(dataset_dir):
+    path = os.path.join(dataset_dir, DATASET_META_PATH)
+    if not os.path.exists(path):
+        return {'rows': 0, 'descriptions': [], 'parts': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_meta(dataset_dir, meta):
+    path = os.path.join(dataset_dir, DATASET_META_PATH)
+    with open(path + '.part', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(path + '.part', path)
+
+
+def load_scaler(dataset_dir):
+    return joblib.load(os.path.join(dataset_dir, DATASET_SCALER_PATH))
+
+
+def iter_csv_chunks(csv_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """CSV'yi yalnızca gerekli sütunlarla ve sıkı veri tipleriyle parça parça okur."""
+    return pd.read_csv(csv_path, usecols=COLUMNS_TO_KEEP, dtype=RAW_DTYPES, chunksize=chunk_size)
+
+
+def find_ingested_part(meta, source):
+    """source dosyası (aynı ad ve imza) daha önce eklendiyse o parçanın kaydını, değilse None döner."""
+    name, signature = os.path.basename(source), file_signature(source)
+    for part in meta['parts']:
+        if part.get('source') == name and part.get('source_signature') == signature:
+            return part
+    return None
+
+
+def stage_chunks(chunks, dataset_dir=DATASET_DIR, source=None, force=False):
+    """DataFrame parçalarını bir parça dosyasına yazar ve güncellenmiş scaler'ı hesaplar, ama veri kümesine eklemez.
+
+    StagedPart döner (hiç satır yoksa None); parça ancak StagedPart.commit() ile veri kümesine girer.
+    source daha önce eklenmişse (satırlar ikinci kez yazılıp scaler istatistikleri kaymasın diye)
+    DuplicateSourceError fırlatılır; force=True bu kontrolü atlar.
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    meta = load_meta(dataset_dir)
+    if source is not None and not force:
+        part = find_ingested_part(meta, source)
+        if part is not None:
+            raise DuplicateSourceError(
+                f"'{source}' veri kümesine zaten eklenmiş ({part['file']}, {part['rows']} satır).")
+    scaler_path = os.path.join(dataset_dir, DATASET_SCALER_PATH)
+    scaler = joblib.load(scaler_path) if os.path.exists(scaler_path) else StandardScaler()
+    descriptions = list(meta['descriptions'])
+    seen = set(descriptions)
+
+    part_name = f"part-{len(meta['parts']):05d}.parquet"
+    staged_path = os.path.join(dataset_dir, part_name) + '.part'
+    rows = 0
+    # Parça dosyası tamamlanmadan meta veriye eklenmez; okuma veya dönüştürme hatasında yarım dosya silinir
+    try:
+        with pq.ParquetWriter(staged_path, SCHEMA) as writer:
+            for chunk in chunks:
+                chunk = chunk[COLUMNS_TO_KEEP]
+                if not isinstance(chunk['description'].dtype, pd.CategoricalDtype):
+                    chunk = chunk.astype({'description': 'category'})
+                for description in chunk['description'].dropna().unique():
+                    if description not in seen:
+                        seen.add(description)
+                        descriptions.append(description)
+                scaler.partial_fit(chunk[NUMERICAL_FEATURES])
+                writer.write_table(pa.Table.from_pandas(chunk, preserve_index=False).cast(SCHEMA))
+                rows += len(chunk)
+    except BaseException:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+        raise
+    if rows == 0:
+        os.remove(staged_path)
+        return None
+
+    part = {'file': part_name, 'rows': rows}
+    if source is not None:
+        part['source'] = os.path.basename(source)
+        part['source_signature'] = file_signature(source)
+    return StagedPart(dataset_dir, part, scaler, descriptions, base_parts=len(meta['parts']))
+
+
+class StagedPart:
+    """Yazılmış ama veri kümesine henüz eklenmemiş parça; commit() ekler, discard() siler."""
+
+    def __init__(self, dataset_dir, part, scaler, descriptions, base_parts):
+        self.dataset_dir = dataset_dir
+        self.part = part
+        self.scaler = scaler
+        self.descriptions = descriptions
+        self.base_parts = base_parts
+
+    @property
+    def rows(self):
+        return self.part['rows']
+
+    @property
+    def _staged_path(self):
+        return os.path.join(self.dataset_dir, self.part['file']) + '.part'
+
+    def commit(self):
+        meta = load_meta(self.dataset_dir)
+        if len(meta['parts']) != self.base_parts:
+            # Aradaki başka bir ekleme scaler istatistiklerini ve parça adını geçersiz kılar
+            raise RuntimeError(f"'{self.dataset_dir}' veri kümesi parça hazırlandıktan sonra değişti; "
+                               "ekleme yeniden yapılmalı.")
+        os.replace(self._staged_path, os.path.join(self.dataset_dir, self.part['file']))
+        scaler_path = os.path.join(self.dataset_dir, DATASET_SCALER_PATH)
+        joblib.dump(self.scaler, scaler_path + '.part')
+        os.replace(scaler_path + '.part', scaler_path)
+        meta['parts'].append(self.part)
+        meta['rows'] += self.rows
+        meta['descriptions'] = self.descriptions
+        _save_meta(self.dataset_dir, meta)
+        return self.rows
+
+    def discard(self):
+        if os.path.exists(self._staged_path):
+            os.remove(self._staged_path)
+
+
+def ingest_chunks(chunks, dataset_dir=DATASET_DIR, source=None, force=False):
+    """DataFrame parçalarını veri kümesine yeni bir parça dosyası olarak ekler, scaler'ı birikimli günceller.
+
+    Yeni eklenen satır sayısını döner. Veri kümesindeki mevcut scaler varsa onun üzerine partial_fit yapılır.
+    Aynı kaynak için kontrol ve force: bkz. stage_chunks.
+    """
+    staged = stage_chunks(chunks, dataset_dir, source=source, force=force)
+    return staged.commit() if staged is not None else 0
+
+
+def ingest_csv(csv_path=RAW_DATA_PATH, dataset_dir=DATASET_DIR, chunk_size=DEFAULT_CHUNK_SIZE, force=False):
+    """CSV dosyasını parça parça okuyup veri kümesine ekler."""
+    return ingest_chunks(iter_csv_chunks(csv_path, chunk_size), dataset_dir, source=csv_path, force=force)
+
+
+# --- Tembel okuma ---
+
+def open_dataset(dataset_dir=DATASET_DIR):
+    meta = load_meta(dataset_dir)
+    paths = [os.path.join(dataset_dir, part['file']) for part in meta['parts']]
+    if not paths:
+        raise FileNotFoundError(f"'{dataset_dir}' dizininde veri kümesi bulunamadı.")
+    return ds.dataset(paths, schema=SCHEMA, format='parquet')
+
+
+def iter_batches(dataset_dir=DATASET_DIR, columns=None, batch_size=DEFAULT_CHUNK_SIZE):
+    """Veri kümesini en fazla batch_size satırlık DataFrame'ler hâlinde okur ('description' kategori tipinde)."""
+    for batch in open_dataset(dataset_dir).to_batches(columns=columns, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def training_columns(descriptions):
+    """Notebook'taki get_dummies + sütun adı temizliği sonrası oluşan sütun sırası."""
+    # get_dummies kategorileri sıralı olarak ekler
+    return pd.Index(NUMERICAL_FEATURES + [description_column_name(d) for d in sorted(descriptions)])
+
+
+def dataset_encoder(dataset_dir=DATASET_DIR, dtype=np.float32):
+    """Veri kümesinin scaler'ı ve açıklamalarıyla FeatureEncoder kurar."""
+    meta = load_meta(dataset_dir)
+    return FeatureEncoder(training_columns(meta['descriptions']), meta['descriptions'], NUMERICAL_FEATURES,
+                          load_scaler(dataset_dir), dtype=dtype)
+
+
+def load_encoded(dataset_dir=DATASET_DIR, encoder=None, batch_size=DEFAULT_CHUNK_SIZE, max_rows=None, random_state=42):
+    """Veri kümesini parça parça kodlayarak önceden ayrılmış (n, n_features) matrise ve hedef dizisine yazar.
+
+    Ara DataFrame kopyaları oluşmaz, ama sonuç matrisi tüm satırları tutar: tepe bellek matris ile bir parçanın
+    toplamıdır ve satır sayısıyla büyür. max_rows verilirse satırların (sırası korunan) rastgele bir alt
+    örneği alınır.
+    """
+    encoder = encoder or dataset_encoder(dataset_dir)
+    n_rows = load_meta(dataset_dir)['rows']
+    keep = None
+    if max_rows is not None and max_rows < n_rows:
+        keep = np.sort(np.random.default_rng(random_state).choice(n_rows, max_rows, replace=False))
+        n_rows = max_rows
+    X = encoder.allocate(n_rows)
+    y = np.empty(n_rows, dtype=np.float32)
+    start = offset = 0
+    for batch in iter_batches(dataset_dir, batch_size=batch_size):
+        if keep is not None:
+            # Bu parçaya düşen seçili satırlar (keep sıralı olduğu için ardışık bir dilim)
+            lo, hi = np.searchsorted(keep, [offset, offset + len(batch)])
+            positions = keep[lo:hi] - offset
+            offset += len(batch)
+            batch = batch.iloc[positions]
+        end = start + len(batch)
+        encoder.encode_frame(batch, out=X[start:end])
+        y[start:end] = batch[TARGET].to_numpy()
+        start = end
+    return X, y
+
+
+def evaluate_streaming(predict_fn, dataset_dir=DATASET_DIR, encoder=None, batch_size=DEFAULT_CHUNK_SIZE):
+    """predict_fn(encoded_matrix) için MAE, MSE ve R² değerlerini veri kümesini tek geçişte okuyarak hesaplar."""
+    encoder = encoder or dataset_encoder(dataset_dir)
+    out = encoder.allocate(batch_size)
+    n = 0
+    abs_error = squared_error = y_sum = y_squared_sum = 0.0
+    for batch in iter_batches(dataset_dir, batch_size=batch_size):
+        matrix = encoder.encode_frame(batch, out=out)
+        y_true = batch[TARGET].to_numpy(dtype=np.float64)
+        error = y_true - np.asarray(predict_fn(matrix), dtype=np.float64)
+        n += len(y_true)
+        abs_error += np.abs(error).sum()
+        squared_error += np.square(error).sum()
+        y_sum += y_true.sum()
+        y_squared_sum += np.square(y_true).sum()
+    if n == 0:
+        raise ValueError("Veri kümesi boş.")
+    total = y_squared_sum - y_sum * y_sum / n
+    return {'MAE': abs_error / n, 'MSE': squared_error / n, 'R²': 1.0 - squared_error / total if total else float('nan')}
+
+
+def peak_memory_mb():
+    # Linux'ta ru_maxrss kilobayt cinsindendir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ham CSV'yi parça parça okuyup sütunlu veri kümesine yaz")
+    parser.add_argument('--csv', default=RAW_DATA_PATH)
+    parser.add_argument('--dataset-dir', default=DATASET_DIR)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--force', action='store_true', help="Daha önce eklenmiş kaynak dosyayı yine de ekle")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        rows = ingest_csv(args.csv, args.dataset_dir, args.chunk_size, force=args.force)
+    except DuplicateSourceError as e:
+        parser.exit(1, f"{e} Tekrar eklemek için --force kullanın.\n")
+    meta = load_meta(args.dataset_dir)
+    print(f"{rows} satır {time.perf_counter() - start:.1f} sn'de eklendi "
+          f"(toplam {meta['rows']} satır, {len(meta['parts'])} parça, {len(meta['descriptions'])} açıklama).")
+    print(f"Tepe bellek: {peak_memory_mb():.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import re
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+# Notebook'taki get_dummies sonrası sütun adlarına uygulanan temizleme ile aynı desen
+_COLUMN_NAME_PATTERN = re.compile(r'[^A-Za-z0-9_]+')
+
+
+def description_column_name(description):
+    """Bir hava durumu açıklamasının eğitimde oluşan one-hot sütun adını döner ('clear sky' -> 'description_clear_sky')."""
+    return _COLUMN_NAME_PATTERN.sub('_', f'description_{description}')
+
+
+def _untimed(stage):
+    return nullcontext()
+
+
+class FeatureEncoder:
+    """Ham girişleri modelin beklediği matrise tek adımda dönüştüren, yükleme anında bir kez kurulan kodlayıcı.
+
+    get_dummies + reindex + scaler.transform zincirinin yerine geçer: açıklama -> sütun indeksi eşlemesi ve
+    scaler ortalama/ölçek değerleri NumPy dizileri olarak önceden hesaplanır, girişler doğrudan önceden
+    ayrılmış bir matrise yazılır.
+    """
+
+    def __init__(self, original_X_columns, all_descriptions, numerical_features, scaler, dtype=np.float64):
+        self.columns = list(original_X_columns)
+        self.numerical_features = list(numerical_features)
+        self.dtype = np.dtype(dtype)
+
+        column_index = {name: i for i, name in enumerate(self.columns)}
+        missing = [name for name in self.numerical_features if name not in column_index]
+        if missing:
+            raise ValueError(f"Sayısal özellikler model sütunlarında bulunamadı: {', '.join(missing)}")
+        self.numerical_index = np.array([column_index[name] for name in self.numerical_features], dtype=np.intp)
+
+        # Eğitimde görülmeyen açıklamalar get_dummies + reindex'te olduğu gibi tüm sıfır olarak kodlanır
+        self.description_index = {}
+        for description in all_descriptions:
+            col = column_index.get(description_column_name(description))
+            if col is not None:
+                self.description_index[description] = col
+        self._known_descriptions = list(self.description_index)
+        self._description_columns = np.array(list(self.description_index.values()), dtype=np.intp)
+
+        scaler_features = list(getattr(scaler, 'feature_names_in_', self.numerical_features))
+        if scaler_features != self.numerical_features:
+            raise ValueError("Scaler sütun sırası 'numerical_features' ile eşleşmiyor.")
+        self.mean = np.asarray(scaler.mean_, dtype=self.dtype)
+        self.scale = np.asarray(scaler.scale_, dtype=self.dtype)
+
+    @property
+    def n_features(self):
+        return len(self.columns)
+
+    def allocate(self, n_rows):
+        """Verilen satır sayısı için sıfırlanmış bir özellik matrisi ayırır."""
+        return np.zeros((n_rows, self.n_features), dtype=self.dtype)
+
+    def encode_arrays(self, numerical_values, descriptions, out=None, timer=None):
+        """Sayısal değer matrisini (n, 7) ve açıklama dizisini ölçeklenmiş, one-hot kodlu matrise yazar.
+
+        timer verilirse (ör. inference_metrics.StageMetrics.timer) 'scale' ve 'onehot' aşamaları ölçülür.
+        """
+        timer = timer or _untimed
+        numerical_values = np.asarray(numerical_values, dtype=self.dtype)
+        if numerical_values.ndim != 2 or numerical_values.shape[1] != len(self.numerical_features):
+            raise ValueError(f"Sayısal girişler (n, {len(self.numerical_features)}) boyutunda olmalıdır.")
+        n_rows = numerical_values.shape[0]
+
+        if out is None:
+            out = self.allocate(n_rows)
+        else:
+            out[:n_rows] = 0
+            out = out[:n_rows]
+
+        with timer('scale'):
+            out[:, self.numerical_index] = (numerical_values - self.mean) / self.scale
+
+        with timer('onehot'):
+            codes = pd.Categorical(np.asarray(descriptions, dtype=object), categories=self._known_descriptions).codes
+            known = codes >= 0
+            out[np.flatnonzero(known), self._description_columns[codes[known]]] = 1
+        return out
+
+    def encode_row(self, current, voltage, temp, pressure, humidity, speed, deg, description, timer=None):
+        """Tek bir okuma için (1, n_features) boyutunda matris döner."""
+        values = dict(current=current, voltage=voltage, temp=temp, pressure=pressure,
+                      humidity=humidity, speed=speed, deg=deg)
+        numerical_values = [[values[name] for name in self.numerical_features]]
+        return self.encode_arrays(numerical_values, [description], timer=timer)
+
+    def encode_frame(self, df, out=None):
+        """Ham sütunları ('current', ..., 'description') içeren bir DataFrame'i kodlar."""
+        return self.encode_arrays(df[self.numerical_features].to_numpy(dtype=self.dtype),
+                                  df['description'].to_numpy(dtype=object), out=out)
+
+    def to_frame(self, matrix):
+        """Kodlanmış matrisi, modelin eğitimdeki sütun adlarıyla DataFrame olarak sarar (kopyalamadan)."""
+        return pd.DataFrame(matrix, columns=self.columns, copy=False)
@@ -0,0 +1,389 @@
+"""Saatlik hava durumu tahminlerinden önümüzdeki 48 saatin aktif güç tahminini üreten iş.
+
+Akış:
+1. Tahmin beslemesi takılabilir bir sağlayıcıdan okunur: yerel dizin (FileForecastProvider) veya HTTP
+   (HttpForecastProvider). Birden fazla saha asyncio ile eşzamanlı çekilir; HTTP sağlayıcı tek bir
+   requests.Session üzerinden bağlantı havuzu kullanır. Test için MockForecastServer yerel bir HTTP
+   sunucusu olarak sentetik beslemeler sunar.
+2. Her tahmin adımı, sahanın saate göre beklenen akım ve voltaj profiliyle eşleştirilir.
+3. Tüm sahaların tüm ufukları tek bir vektörel toplu işlemde FeatureEncoder (kodlama + scaler) ve
+   lr_model.predict ile tahmin edilir.
+4. Sonuçlar zaman indeksli Parquet deposuna (her çalıştırma için bir dosya) yazılır; read_forecasts her
+   saha ve saat için en son üretilen tahmini döner.
+
+Besleme biçimi (OpenWeather One Call 'hourly' yapısı, metrik birimler):
+    {"hourly": [{"dt": 1700000000, "temp": 21.3, "pressure": 1013, "humidity": 40,
+                 "wind_speed": 2.1, "wind_deg": 180, "weather": [{"description": "clear sky"}]}, ...]}
+
+Profil dosyası (CSV): site, hour, current, voltage ('*' sitesi tüm sahalar için varsayılandır).
+
+Kullanım:
+    python forecast_job.py --sites ankara izmir --source forecasts/ --profiles profiles.csv
+    python forecast_job.py --sites ankara izmir bursa --mock --profiles-from-raw energy_weather_raw_data.csv
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+import requests
+
+from model_resources import artifact_dir, load_artifacts
+
+FORECAST_HOURS = 48
+FORECAST_STORE_DIR = "forecast_store"
+FORECAST_SOURCE_ENV = "ENERGY_FORECAST_SOURCE"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PROFILE_SITE = '*'
+
+PROFILE_COLUMNS = ['current', 'voltage']
+PREDICTION_COLUMN = 'predicted_active_power'
+
+
+class ForecastError(Exception):
+    """Tahmin beslemesi okunamadığında veya eksik olduğunda verilir."""
+
+
+def parse_hourly_payload(payload, site):
+    """OpenWeather 'hourly' yapısındaki beslemeyi (time, hava durumu sütunları) DataFrame'ine dönüştürür."""
+    try:
+        hourly = payload['hourly']
+        df = pd.DataFrame({
+            'time': pd.to_datetime([step['dt'] for step in hourly], unit='s', utc=True),
+            'temp': [step['temp'] for step in hourly],
+            'pressure': [step['pressure'] for step in hourly],
+            'humidity': [step['humidity'] for step in hourly],
+            'speed': [step.get('wind_speed', 0.0) for step in hourly],
+            'deg': [step.get('wind_deg', 0.0) for step in hourly],
+            'description': [step['weather'][0]['description'] for step in hourly],
+        })
+    except (KeyError, IndexError, TypeError) as e:
+        raise ForecastError(f"'{site}' için tahmin beslemesi beklenen biçimde değil: {e!r}") from e
+    df.insert(0, 'site', site)
+    return df
+
+
+# --- Sağlayıcılar ---
+
+class FileForecastProvider:
+    """<directory>/<site>.json dosyalarından okuyan sağlayıcı (yerel test ve çevrimdışı çalışma için)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _read(self, site):
+        path = os.path.join(self.directory, f'{site}.json')
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise ForecastError(f"'{path}' okunamadı: {e}") from e
+
+    async def fetch(self, site):
+        return parse_hourly_payload(await asyncio.to_thread(self._read, site), site)
+
+    def close(self):
+        pass
+
+
+class HttpForecastProvider:
+    """url_template ('{site}' yer tutuculu) adresinden JSON besleme çeken sağlayıcı.
+
+    İstekler asyncio iş parçacıklarında çalışır; aynı Session ve en fazla 'concurrency' bağlantılık
+    havuz kullanıldığından sahalar arasında bağlantılar yeniden kullanılır.
+    """
+
+    def __init__(self, url_template, concurrency=DEFAULT_CONCURRENCY, timeout=30, session=None):
+        if '{site}' not in url_template:
+            url_template = url_template.rstrip('/') + '/{site}'
+        self.url_template = url_template
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _get(self, site):
+        url = self.url_template.format(site=requests.utils.quote(site))
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise ForecastError(f"'{url}' alınamadı: {e}") from e
+
+    async def fetch(self, site):
+        return parse_hourly_payload(await asyncio.to_thread(self._get, site), site)
+
+    def close(self):
+        self.session.close()
+
+
+def provider_from_source(source=None, concurrency=DEFAULT_CONCURRENCY):
+    """Kaynak tanımından (dizin yolu veya http(s) adresi) uygun sağlayıcıyı oluşturur."""
+    source = source if source is not None else os.environ.get(FORECAST_SOURCE_ENV)
+    if not source:
+        raise ForecastError(f"Tahmin kaynağı belirtilmedi (--source veya ${FORECAST_SOURCE_ENV}).")
+    if source.startswith(('http://', 'https://')):
+        return HttpForecastProvider(source, concurrency=concurrency)
+    return FileForecastProvider(source)
+
+
+async def fetch_forecasts(provider, sites, hours=FORECAST_HOURS, concurrency=DEFAULT_CONCURRENCY):
+    """Tüm sahaların beslemelerini eşzamanlı çeker; her saha için ilk 'hours' adımı tek bir DataFrame'de döner."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_site(site):
+        async with semaphore:
+            df = await provider.fetch(site)
+        return df.sort_values('time').head(hours)
+
+    frames = await asyncio.gather(*(fetch_site(site) for site in sites))
+    return pd.concat(frames, ignore_index=True)
+
+
+# --- Akım / voltaj profilleri ---
+
+def load_profiles(path):
+    """site, hour, current, voltage sütunlu profil CSV'sini okur."""
+    profiles = pd.read_csv(path, dtype={'site': str})
+    missing = {'site', 'hour', *PROFILE_COLUMNS} - set(profiles.columns)
+    if missing:
+        raise ForecastError(f"Profil dosyasında eksik sütunlar: {', '.join(sorted(missing))}")
+    return profiles[['site', 'hour', *PROFILE_COLUMNS]]
+
+
+def profiles_from_raw(csv_path, chunk_size=500_000):
+    """Ham veri setinden (date sütunu) saate göre ortalama akım/voltaj profilini parça parça hesaplar."""
+    sums = np.zeros((24, 2))
+    counts = np.zeros(24)
+    for chunk in pd.read_csv(csv_path, usecols=['date', *PROFILE_COLUMNS], chunksize=chunk_size,
+                             dtype={name: 'float32' for name in PROFILE_COLUMNS}):
+        hours = pd.to_datetime(chunk['date']).dt.hour.to_numpy()
+        np.add.at(sums, hours, chunk[PROFILE_COLUMNS].to_numpy(dtype=np.float64))
+        np.add.at(counts, hours, 1)
+    if not counts.any():
+        raise ForecastError(f"'{csv_path}' içinde profil hesaplanacak satır yok.")
+    # Verisi olmayan saatler genel ortalamayla doldurulur
+    means = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], sums.sum(axis=0) / counts.sum())
+    return pd.DataFrame({'site': DEFAULT_PROFILE_SITE, 'hour': np.arange(24),
+                         'current': means[:, 0], 'voltage': means[:, 1]})
+
+
+def attach_profiles(forecasts, profiles, tz='UTC'):
+    """Her adımı saha ve yerel saate göre beklenen akım/voltaj değerleriyle eşleştirir.
+
+    Sahaya özel profil yoksa '*' profili kullanılır; profili bulunmayan adımlar hata verir.
+    """
+    df = forecasts.copy()
+    df['hour'] = df['time'].dt.tz_convert(tz).dt.hour
+    site_profiles = profiles[profiles['site'] != DEFAULT_PROFILE_SITE]
+    default_profile = profiles[profiles['site'] == DEFAULT_PROFILE_SITE].drop(columns='site')
+    df = df.merge(site_profiles, on=['site', 'hour'], how='left')
+    if not default_profile.empty:
+        df = df.merge(default_profile, on='hour', how='left', suffixes=('', '_default'))
+        for name in PROFILE_COLUMNS:
+            df[name] = df[name].fillna(df.pop(f'{name}_default'))
+    missing = df[PROFILE_COLUMNS].isna().any(axis=1)
+    if missing.any():
+        sites = ', '.join(sorted(df.loc[missing, 'site'].unique()))
+        raise ForecastError(f"Şu sahalar için akım/voltaj profili bulunamadı: {sites}")
+    return df.drop(columns='hour')
+
+
+# --- Tahmin ve depolama ---
+
+def score_forecasts(df, model, encoder):
+    """Tüm saha ve ufukları tek bir toplu kodlama + predict çağrısıyla tahmin eder."""
+    matrix = encoder.encode_frame(df)
+    df = df.copy()
+    df[PREDICTION_COLUMN] = model.predict(encoder.to_frame(matrix))
+    return df
+
+
+def write_forecasts(df, store_dir=FORECAST_STORE_DIR, issued_at=None):
+    """Çalıştırmanın sonuçlarını store_dir altına issued=<zaman>.parquet olarak yazar."""
+    issued_at = issued_at or datetime.now(timezone.utc)
+    df = df.copy()
+    df.insert(0, 'issued_at', pd.Timestamp(issued_at))
+    df.insert(3, 'horizon_h', ((df['time'] - df['issued_at']) / pd.Timedelta(hours=1)).round().astype('int32'))
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, f"issued={pd.Timestamp(issued_at):%Y%m%dT%H%M%SZ}.parquet")
+    df.to_parquet(path + '.part', index=False)
+    os.replace(path + '.part', path)
+    return path
+
+
+def read_forecasts(store_dir=FORECAST_STORE_DIR, site=None, start=None, end=None, latest=True):
+    """Depodaki tahminleri zamana göre indeksli okur.
+
+    latest=True ise her saha ve saat için yalnızca en son üretilen tahmin döner.
+    """
+    import pyarrow.dataset as ds
+
+    paths = sorted(os.path.join(store_dir, name) for name in os.listdir(store_dir) if name.endswith('.parquet'))
+    if not paths:
+        return pd.DataFrame()
+    dataset = ds.dataset(paths, format='parquet')
+    condition = None
+    for expression in [ds.field('site') == site if site is not None else None,
+                       ds.field('time') >= pd.Timestamp(start) if start is not None else None,
+                       ds.field('time') < pd.Timestamp(end) if end is not None else None]:
+        if expression is not None:
+            condition = expression if condition is None else condition & expression
+    df = dataset.to_table(filter=condition).to_pandas()
+    df = df.sort_values(['site', 'time', 'issued_at'])
+    if latest:
+        df = df.drop_duplicates(['site', 'time'], keep='last')
+    return df.set_index('time')
+
+
+async def run_forecast_job(provider, sites, profiles, model, encoder, store_dir=FORECAST_STORE_DIR,
+                           hours=FORECAST_HOURS, concurrency=DEFAULT_CONCURRENCY, tz='UTC'):
+    """Beslemeleri çeker, profillerle eşleştirir, tek toplu işlemde tahmin eder ve depoya yazar."""
+    issued_at = pd.Timestamp.now(tz='UTC').floor('h')
+    timings = {}
+    start = time.perf_counter()
+    forecasts = await fetch_forecasts(provider, sites, hours, concurrency)
+    timings['fetch_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scored = score_forecasts(attach_profiles(forecasts, profiles, tz), model, encoder)
+    timings['score_seconds'] = time.perf_counter() - start
+
+    path = write_forecasts(scored, store_dir, issued_at)
+    return scored, path, timings
+
+
+# --- Test için sahte HTTP beslemesi ---
+
+def synthetic_forecast(site, start, hours=FORECAST_HOURS, descriptions=None):
+    """Saha adına göre tekrarlanabilir, günlük döngülü sentetik bir saatlik besleme üretir."""
+    rng = np.random.default_rng(zlib.crc32(site.encode('utf-8')))
+    descriptions = descriptions or ['clear sky', 'few clouds', 'scattered clouds', 'broken clouds', 'light rain']
+    start = pd.Timestamp(start).floor('h')
+    base_temp = rng.uniform(5, 25)
+    hourly = []
+    for step in range(hours):
+        moment = start + pd.Timedelta(hours=step)
+        daily = np.sin((moment.hour - 9) / 24 * 2 * np.pi)
+        hourly.append({
+            'dt': int(moment.timestamp()),
+            'temp': round(float(base_temp + 6 * daily + rng.normal(0, 1)), 2),
+            'pressure': round(float(1013 + rng.normal(0, 4))),
+            'humidity': round(float(np.clip(55 - 20 * daily + rng.normal(0, 5), 5, 100))),
+            'wind_speed': round(float(abs(rng.normal(3, 1.5))), 2),
+            'wind_deg': round(float(rng.uniform(0, 360))),
+            'weather': [{'description': str(rng.choice(descriptions))}],
+        })
+    return {'site': site, 'hourly': hourly}
+
+
+class MockForecastServer:
+    """GET /forecast/<site> isteklerine sentetik besleme döndüren yerel HTTP sunucusu.
+
+    latency_ms ile her yanıta yapay gecikme eklenebilir (eşzamanlı çekmenin etkisini görmek için).
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, hours=FORECAST_HOURS, latency_ms=0.0, descriptions=None):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                prefix = '/forecast/'
+                if not self.path.startswith(prefix):
+                    self.send_error(404)
+                    return
+                site = unquote(self.path[len(prefix):])
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                body = json.dumps(synthetic_forecast(site, server.start, server.hours, server.descriptions)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.hours = hours
+        self.latency_ms = latency_ms
+        self.descriptions = descriptions
+        self.start = pd.Timestamp.now(tz='UTC').floor('h') + pd.Timedelta(hours=1)
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/forecast/{{site}}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hava durumu tahminlerinden 48 saatlik aktif güç tahmini")
+    parser.add_argument('--sites', nargs='+', required=True)
+    parser.add_argument('--source', default=None,
+                        help=f"Besleme dizini veya '{{site}}' içeren http(s) adresi (varsayılan: ${FORECAST_SOURCE_ENV})")
+    parser.add_argument('--mock', action='store_true', help="Yerel sahte HTTP beslemesi başlat ve onu kullan")
+    parser.add_argument('--mock-latency-ms', type=float, default=0.0)
+    parser.add_argument('--profiles', default=None, help="site,hour,current,voltage sütunlu profil CSV'si")
+    parser.add_argument('--profiles-from-raw', default=None,
+                        help="Profili ham veri setinden (date, current, voltage) saatlik ortalama olarak hesapla")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--store-dir', default=FORECAST_STORE_DIR)
+    parser.add_argument('--hours', type=int, default=FORECAST_HOURS)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--timezone', default='UTC', help="Profil saatlerinin yorumlandığı saat dilimi")
+    args = parser.parse_args()
+
+    if args.profiles:
+        profiles = load_profiles(args.profiles)
+    elif args.profiles_from_raw:
+        profiles = profiles_from_raw(args.profiles_from_raw)
+    else:
+        parser.error("--profiles veya --profiles-from-raw gereklidir.")
+
+    artifacts = load_artifacts(artifact_dir(args.base_dir))
+
+    async def run(provider):
+        try:
+            return await run_forecast_job(provider, args.sites, profiles, artifacts.model, artifacts.encoder,
+                                          args.store_dir, args.hours, args.concurrency, args.timezone)
+        finally:
+            provider.close()
+
+    if args.mock:
+        with MockForecastServer(hours=args.hours, latency_ms=args.mock_latency_ms,
+                                descriptions=list(artifacts.all_descriptions)) as server:
+            scored, path, timings = asyncio.run(run(HttpForecastProvider(server.url, concurrency=args.concurrency)))
+    else:
+        scored, path, timings = asyncio.run(run(provider_from_source(args.source, args.concurrency)))
+
+    print(f"{len(args.sites)} saha x {args.hours} saat = {len(scored)} tahmin '{path}' dosyasına yazıldı "
+          f"(çekme {timings['fetch_seconds'] * 1000:.0f} ms, tahmin {timings['score_seconds'] * 1000:.0f} ms).")
+    summary = scored.groupby('site')[PREDICTION_COLUMN].agg(['mean', 'min', 'max'])
+    print(summary.to_string(float_format=lambda v: f'{v:.2f}'))
+
+
+if __name__ == '__main__':
+    main()
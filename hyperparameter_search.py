@@ -0,0 +1,349 @@
+"""Tüm model aileleri için eşzamanlı, diskte önbellekli ve ardışık yarılamalı (successive halving) parametre araması.
+
+training_pipeline.py'nin ayarlama adımıdır. Notebook'taki GridSearchCV döngüsüne göre:
+
+* Model aileleri sırayla değil, aynı süreç havuzunda (ortak CPU bütçesiyle) eşzamanlı aranır.
+* LightGBM ve XGBoost için n_estimators değerleri ayrı ayrı eğitilmez: en büyük değerle bir kez eğitilip
+  ilk k ağacın tahminleri kullanılır (erken durdurma ile aynı fikir; sonuçlar ayrı eğitimlerle birebir aynıdır).
+* 'halving' yönteminde adaylar önce her katın eğitim verisinin küçük bir bölümüyle denenir; her turda
+  en iyi 1/factor aday kalır ve veri factor katına çıkar. Son tur tüm veriyle yapılır ve seçilen
+  parametrenin kat dışı (out-of-fold) tahminleri stacking meta-modeline verilir. 'grid' yöntemi
+  GridSearchCV ile aynı, kapsamlı aramadır.
+* Her (aile, parametre, kat, veri miktarı) eğitiminin kat dışı tahminleri, veri özeti (hash) ve
+  parametrelerle anahtarlanarak tuning_cache/ altına yazılır; yarıda kalan veya tekrarlanan aramalar
+  yalnızca eksik eğitimleri yapar. Dizin adı kütüphane sürümlerini (sklearn, LightGBM, XGBoost, ...) de
+  içerir; bir kütüphane güncellendiğinde eski sürümün tahminleri yeniden kullanılmaz.
+
+Kullanım (training_pipeline.py üzerinden):
+    python training_pipeline.py --data energy_weather_raw_data.csv --search halving --n-jobs 8
+    python training_pipeline.py --data energy_weather_raw_data.csv --search grid --no-tuning-cache
+"""
+import hashlib
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+
+DEFAULT_CACHE_DIR = "tuning_cache"
+SEARCH_METHODS = ('halving', 'grid')
+DEFAULT_HALVING_FACTOR = 3
+# İlk turlarda kat başına kullanılacak en az eğitim satırı
+MIN_HALVING_ROWS = 500
+# Tek eğitimle tüm değerleri değerlendirilebilen parametre (artırımlı boosting)
+STAGED_PARAM = 'n_estimators'
+
+
+def set_threads(model, n_threads):
+    """Modelin kendi iş parçacığı sayısını ayarlar (destekliyorsa)."""
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_threads)
+    return model
+
+
+def split_cpu_budget(n_jobs, n_tasks):
+    """Toplam çekirdek bütçesini dış paralellik ve model başına iş parçacığı sayısı olarak böler."""
+    n_jobs = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    outer = max(1, min(n_jobs, n_tasks))
+    inner = max(1, n_jobs // outer)
+    return outer, inner
+
+
+def versions_hash():
+    """Kütüphane sürümlerinin kısa özeti; önbellek dizinini sürüme bağlar."""
+    from benchmark_suite import library_versions
+
+    versions = library_versions()
+    text = ';'.join(f"{name}={versions[name]}" for name in sorted(versions))
+    return hashlib.blake2b(text.encode(), digest_size=6).hexdigest()
+
+
+def data_hash(X_values, y_values):
+    """Özellik matrisi ve hedefin içeriğine göre kısa özet; önbellek anahtarlarının temelidir."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (X_values, y_values):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()
+
+
+def supports_staged(model):
+    """LightGBM ve XGBoost modelleri ilk k ağaçla tahmin yapabilir."""
+    return type(model).__module__.split('.')[0] in ('lightgbm', 'xgboost')
+
+
+def staged_predict(model, X, n_estimators):
+    """Eğitilmiş boosting modelinin yalnızca ilk n_estimators ağacıyla tahmini."""
+    if type(model).__module__.startswith('lightgbm'):
+        return model.predict(X, num_iteration=n_estimators)
+    return model.predict(X, iteration_range=(0, n_estimators))
+
+
+class FoldCache:
+    """Kat dışı tahminlerin diskteki önbelleği; cache_dir/<veri özeti>-<sürüm özeti>/<eğitim anahtarı>.joblib."""
+
+    def __init__(self, cache_dir, data_key):
+        self.directory = os.path.join(cache_dir, data_key) if cache_dir else None
+        self.hits = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.joblib")
+
+    def get(self, key):
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        try:
+            value = joblib.load(self._path(key))
+        except Exception:
+            return None  # Bozuk/yarım dosya: eğitim yeniden yapılır
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        joblib.dump(value, path + '.part')
+        os.replace(path + '.part', path)
+
+
+# --- Çalışan süreçler ---
+# Veri (X, y, katlar) her çalışana bir kez, mmap ile paylaşılan bir dosyadan yüklenir; görevler yalnızca
+# parametreleri ve kat numarasını taşır.
+_worker_data = None
+
+
+def _init_worker(data_path):
+    global _worker_data
+    _worker_data = joblib.load(data_path, mmap_mode='r')
+
+
+def _train_subset(data, fold_index, n_train):
+    train_index, _ = data['folds'][fold_index]
+    if n_train >= len(train_index):
+        return train_index
+    # Ara turlar: katın eğitim satırlarından sabit tohumla karıştırılmış ilk n_train satır
+    return np.sort(data['orders'][fold_index][:n_train])
+
+
+def _fit_task(model, params, staged_values, fold_index, n_train, n_threads):
+    """Bir (parametre grubu, kat, veri miktarı) eğitimi; {n_estimators veya None: kat dışı tahmin} döner."""
+    data = _worker_data
+    _, test_index = data['folds'][fold_index]
+    train_index = _train_subset(data, fold_index, n_train)
+    X, y = data['X'], data['y']
+    model = set_threads(clone(model).set_params(**params), n_threads)
+    model.fit(X[train_index], y[train_index])
+    X_test = X[test_index]
+    if staged_values is None:
+        return {None: model.predict(X_test)}
+    return {n: staged_predict(model, X_test, n) for n in staged_values}
+
+
+class _InlineExecutor:
+    """Tek iş bütçesinde görevleri aynı süreçte çalıştırır (süreç başlatma ve veri kopyalama olmadan)."""
+
+    def __init__(self, data):
+        global _worker_data
+        _worker_data = data
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        global _worker_data
+        _worker_data = None
+
+
+class _FamilySearch:
+    """Bir model ailesinin tur tur ilerleyen araması."""
+
+    def __init__(self, name, model, grid, method, factor):
+        self.name = name
+        self.model = model
+        self.candidates = list(ParameterGrid(grid))
+        self.factor = factor
+        self.staged = supports_staged(model) and all(STAGED_PARAM in c for c in self.candidates)
+        self.rung = 0
+        self.alive = list(range(len(self.candidates)))
+        # Tur sayısı aday sayısına değil, ayrı eğitim gerektiren grup sayısına göre belirlenir
+        n_groups = len(self.groups())
+        if method == 'grid' or n_groups == 1:
+            self.n_rungs = 1
+        else:
+            self.n_rungs = math.ceil(math.log(n_groups, factor) - 1e-9) + 1
+        self.result = None
+        self.fits = 0
+
+    def n_train(self, train_size):
+        """Bu turda bir katta kullanılacak eğitim satırı sayısı (son tur: tümü)."""
+        n = int(train_size * self.factor ** (self.rung - (self.n_rungs - 1)))
+        return train_size if n >= train_size else min(train_size, max(n, MIN_HALVING_ROWS))
+
+    def groups(self):
+        """Bu turun eğitim grupları: [(ortak parametreler, staged değerler, aday indeksleri)]."""
+        if not self.staged:
+            return [(self.candidates[i], None, [i]) for i in self.alive]
+        grouped = {}
+        for i in self.alive:
+            params = {k: v for k, v in self.candidates[i].items() if k != STAGED_PARAM}
+            grouped.setdefault(repr(sorted(params.items())), (params, []))[1].append(i)
+        groups = []
+        for params, indices in grouped.values():
+            staged_values = sorted({self.candidates[i][STAGED_PARAM] for i in indices})
+            groups.append(({**params, STAGED_PARAM: staged_values[-1]}, tuple(staged_values), indices))
+        return groups
+
+    def task_key(self, params, staged_values, fold_index, n_train, cv, random_state):
+        model = clone(self.model).set_params(**params)
+        model_params = {k: v for k, v in model.get_params().items() if k != 'n_jobs'}
+        text = repr((self.name, type(model).__module__, type(model).__qualname__, sorted(model_params.items()),
+                     staged_values, cv, fold_index, n_train, random_state))
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+def _wave(searches, folds, cv, random_state):
+    """Tamamlanmamış ailelerin mevcut turundaki tüm görevler."""
+    tasks = []
+    for search in searches.values():
+        if search.result is not None:
+            continue
+        for params, staged_values, indices in search.groups():
+            for fold_index, (train_index, _) in enumerate(folds):
+                n_train = search.n_train(len(train_index))
+                key = search.task_key(params, staged_values, fold_index, n_train, cv, random_state)
+                tasks.append((search, params, staged_values, indices, fold_index, n_train, key))
+    return tasks
+
+
+def search_with_oof(models, param_grids, X, y, cv=3, n_jobs=-1, method='halving', factor=DEFAULT_HALVING_FACTOR,
+                    cache_dir=DEFAULT_CACHE_DIR, random_state=42):
+    """Tüm model aileleri için parametre araması; her model için {'params', 'cv_r2', 'oof'} döner.
+
+    'oof', seçilen parametrelerin tüm veriyle yapılan son turdaki kat dışı tahminleridir.
+    """
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Bilinmeyen arama yöntemi: {method} (seçenekler: {', '.join(SEARCH_METHODS)})")
+    if factor < 2:
+        raise ValueError("Yarılama katsayısı en az 2 olmalıdır.")
+    start = time.perf_counter()
+    # Veri kümesinden gelen float32 matris float64'e kopyalanmaz
+    X_values = np.asarray(X)
+    if X_values.dtype not in (np.float32, np.float64):
+        X_values = X_values.astype(np.float64)
+    y_values = np.asarray(y, dtype=np.float64)
+
+    folds = list(KFold(n_splits=cv).split(X_values))
+    rng = np.random.default_rng(random_state)
+    data = {'X': X_values, 'y': y_values, 'folds': folds,
+            'orders': [rng.permutation(train_index) for train_index, _ in folds]}
+    cache = FoldCache(cache_dir, f"{data_hash(X_values, y_values)}-{versions_hash()}")
+    searches = {name: _FamilySearch(name, model, param_grids.get(name, {}), method, factor)
+                for name, model in models.items()}
+
+    # Bütçe ilk turdaki (en kalabalık) görev sayısına göre bölünür
+    outer, inner = split_cpu_budget(n_jobs, len(_wave(searches, folds, cv, random_state)))
+    temp_dir = None
+    if outer == 1:
+        executor = _InlineExecutor(data)
+    else:
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix='data-', dir=cache_dir or None)
+        data_path = os.path.join(temp_dir, 'data.joblib')
+        joblib.dump(data, data_path)
+        # fork yerine spawn: ana süreçte başlamış olabilecek OpenMP iş parçacıkları çalışanlara taşınmaz
+        executor = ProcessPoolExecutor(max_workers=outer, initializer=_init_worker, initargs=(data_path,),
+                                       mp_context=multiprocessing.get_context('spawn'))
+    print(f"Ayarlama ({method}): {len(models)} model ailesi, {outer} eşzamanlı iş x {inner} iş parçacığı")
+
+    pending = {}  # future -> görev
+    outstanding = {name: 0 for name in searches}
+    predictions = {name: {} for name in searches}  # (aday, kat) -> kat dışı tahmin
+
+    def record(task, output):
+        search, _, staged_values, indices, fold_index, _, _ = task
+        for i in indices:
+            predictions[search.name][i, fold_index] = output[search.candidates[i][STAGED_PARAM] if staged_values else None]
+
+    def submit_round(tasks):
+        for task in tasks:
+            search, params, staged_values, _, fold_index, n_train, key = task
+            outstanding[search.name] += 1
+            cached = cache.get(key)
+            if cached is not None:
+                record(task, cached)
+                outstanding[search.name] -= 1
+                continue
+            search.fits += 1
+            future = executor.submit(_fit_task, search.model, params, staged_values, fold_index, n_train, inner)
+            pending[future] = task
+        # Tüm görevleri önbellekten gelen aileler beklemeden bir sonraki tura geçer
+        for search in {task[0] for task in tasks}:
+            if search.result is None and outstanding[search.name] == 0:
+                advance(search)
+
+    def advance(search):
+        # Turdaki tüm görevler bitti: adayları puanla, ya eleyip sonraki turu başlat ya da sonucu kaydet
+        fold_predictions = predictions[search.name]
+        scores = np.array([[r2_score(y_values[test_index], fold_predictions[i, fold_index])
+                            for fold_index, (_, test_index) in enumerate(folds)] for i in search.alive])
+        mean_scores = scores.mean(axis=1)
+        if search.rung < search.n_rungs - 1:
+            # Eleme grup bazındadır: bir grubun puanı, içindeki en iyi n_estimators değerinin puanıdır
+            candidate_scores = dict(zip(search.alive, mean_scores))
+            groups = [indices for _, _, indices in search.groups()]
+            group_scores = np.array([max(candidate_scores[i] for i in indices) for indices in groups])
+            keep = max(1, math.ceil(len(groups) / search.factor))
+            search.alive = sorted(i for g in np.argsort(-group_scores, kind='stable')[:keep] for i in groups[g])
+            search.rung += 1
+            predictions[search.name] = {}
+            submit_round(_wave({search.name: search}, folds, cv, random_state))
+            return
+        # GridSearchCV ile aynı seçim: ortalama R² skoru en yüksek olan ilk aday
+        best_position = int(np.argmax(mean_scores))
+        best = search.alive[best_position]
+        oof = np.empty(len(y_values))
+        for fold_index, (_, test_index) in enumerate(folds):
+            oof[test_index] = fold_predictions[best, fold_index]
+        search.result = {'params': search.candidates[best], 'cv_r2': float(mean_scores[best_position]), 'oof': oof}
+        print(f"--- {search.name}: en iyi parametreler {search.candidates[best]} "
+              f"(CV R² {mean_scores[best_position]:.4f}, {search.n_rungs} tur, {search.fits} eğitim)")
+
+    try:
+        submit_round(_wave(searches, folds, cv, random_state))
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                search, key = task[0], task[-1]
+                output = future.result()
+                cache.put(key, output)
+                record(task, output)
+                outstanding[search.name] -= 1
+                if outstanding[search.name] == 0:
+                    advance(search)
+    finally:
+        # Bir görev hata verirse kuyruktaki görevler iptal edilir; hata tüm arama bitmeden yükseltilir
+        executor.shutdown(cancel_futures=True)
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    total_fits = sum(search.fits for search in searches.values())
+    print(f"Ayarlama tamamlandı: {total_fits} eğitim, {cache.hits} sonuç önbellekten ({time.perf_counter() - start:.1f} sn)")
+    return {name: search.result for name, search in searches.items()}
@@ -0,0 +1,341 @@
+"""Yeni sayaç okumalarıyla modelin tamamen yeniden eğitilmeden güncellenmesi.
+
+Adımlar (süre yalnızca yeni veri boyutuyla ölçeklenir):
+
+1. Yeni satırlar data_ingestion.py veri kümesi için yeni bir parça olarak hazırlanır; parça ancak yeni sürüm
+   yazılıp etkinleştirildikten sonra veri kümesine eklenir (başarısız bir güncelleme veriyi eklemez ve
+   güvenle tekrarlanabilir).
+2. StandardScaler istatistikleri partial_fit ile güncellenir. Ölçeklenmiş uzay değiştiği için mevcut
+   modeller de aynı afin dönüşümle uyarlanır (ağaç eşikleri ve lr.joblib katsayıları); eski veriler için
+   tahminler değişmez.
+3. LightGBM ve XGBoost temel modellerine yeni satırlar üzerinde --boost-rounds kadar ağaç eklenir
+   (init_model / xgb_model ile devam eden boosting). RandomForest olduğu gibi kalır.
+4. Yalnızca Ridge meta-modeli, yeni satırların kat dışı (out-of-fold) tahminleriyle ve önceki
+   güncellemelerden saklanan en son --meta-window satırla yeniden eğitilir.
+5. Sonuç model_versions/vNNNN/ altına eksiksiz bir artifact seti olarak yazılır ve CURRENT dosyası bu
+   sürümü gösterecek şekilde atomik olarak güncellenir; uygulama bir sonraki yeniden çalıştırmada yeni
+   sürüme geçer. Öğrenci model (student_model.joblib) yeni sürüme taşınmaz: eski stacking modelinden
+   damıtıldığı için bu sürümde model_distillation.py ile yeniden damıtılmalıdır.
+
+Kullanım:
+    python incremental_update.py --csv yeni_okumalar.csv --dataset-dir energy_dataset --boost-rounds 20
+"""
+import argparse
+import copy
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import Ridge
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+from artifact_store import write_manifest
+from data_ingestion import COLUMNS_TO_KEEP, DATASET_DIR, RAW_DTYPES, TARGET, DuplicateSourceError, stage_chunks
+from feature_encoder import FeatureEncoder
+from model_resources import (ALL_DESCRIPTIONS_PATH, CURRENT_VERSION_PATH, LR_PATH, MANIFEST_JOBLIBS, MODEL_PATH,
+                             MODEL_VERSIONS_DIR, NUMERICAL_FEATURES_PATH, ORIGINAL_X_COLUMNS_PATH, SCALER_PATH,
+                             STUDENT_MODEL_PATH, artifact_dir, current_version, load_joblib)
+from training_pipeline import dump_artifact
+
+VERSION_INFO_PATH = "version.json"
+META_OOF_PATH = "meta_oof.joblib"
+DEFAULT_BOOST_ROUNDS = 20
+DEFAULT_META_WINDOW = 100_000
+
+
+# --- Ölçek değişikliğinin modellere yansıtılması ---
+# Eski ölçeklenmiş değer x_eski = (ham - m0) / s0, yenisi x_yeni = (ham - m1) / s1 = a * x_eski + b.
+# a > 0 olduğundan dönüşüm sırayı korur: ağaçlarda eşikler aynı dönüşümle taşınırsa kararlar değişmez.
+
+def scaler_shift(old_scaler, new_scaler):
+    a = old_scaler.scale_ / new_scaler.scale_
+    b = (old_scaler.mean_ - new_scaler.mean_) / new_scaler.scale_
+    return a, b
+
+
+def _rescale_sklearn_trees(model, shifts):
+    for estimator in getattr(model, 'estimators_', [model]):
+        state = estimator.tree_.__getstate__()
+        nodes = state['nodes'].copy()
+        for feature, (a, b) in shifts.items():
+            split = nodes['feature'] == feature
+            nodes['threshold'][split] = a * nodes['threshold'][split] + b
+        state['nodes'] = nodes
+        estimator.tree_.__setstate__(state)
+
+
+def _rescale_lightgbm(model, shifts):
+    import lightgbm as lgb
+
+    def shift_interval(match, feature):
+        a, b = shifts[feature]
+        low, high = float(match.group(1)), float(match.group(2))
+        return f'[{a * low + b!r}:{a * high + b!r}]'
+
+    lines = []
+    features = None
+    for line in model.booster_.model_to_string().splitlines():
+        key, _, value = line.partition('=')
+        if key == 'tree_sizes':
+            # Ağaç blok boyutları eşik metinleri değişince geçersiz olur; LightGBM bu satır olmadan da yükler
+            continue
+        if key == 'feature_infos':
+            infos = value.split(' ')
+            for feature in shifts:
+                infos[feature] = re.sub(r'\[([^:]+):([^\]]+)\]', lambda m, f=feature: shift_interval(m, f), infos[feature])
+            line = 'feature_infos=' + ' '.join(infos)
+        elif key == 'split_feature':
+            features = [int(f) for f in value.split(' ')]
+        elif key == 'threshold' and features is not None:
+            thresholds = [float(t) for t in value.split(' ')]
+            for i, feature in enumerate(features):
+                if feature in shifts:
+                    a, b = shifts[feature]
+                    thresholds[i] = a * thresholds[i] + b
+            line = 'threshold=' + ' '.join(repr(t) for t in thresholds)
+            features = None
+        lines.append(line)
+    model._Booster = lgb.Booster(model_str='\n'.join(lines) + '\n')
+
+
+def _rescale_xgboost(model, shifts):
+    import xgboost as xgb
+    raw = json.loads(model.get_booster().save_raw('json'))
+    for tree in raw['learner']['gradient_booster']['model']['trees']:
+        conditions = tree['split_conditions']
+        for node, (feature, left) in enumerate(zip(tree['split_indices'], tree['left_children'])):
+            # Yapraklarda split_conditions yaprak değerini tutar
+            if left != -1 and feature in shifts:
+                a, b = shifts[feature]
+                conditions[node] = a * conditions[node] + b
+    booster = xgb.Booster()
+    booster.load_model(bytearray(json.dumps(raw).encode('utf-8')))
+    model._Booster = booster
+
+
+def _rescale_linear(model, shifts):
+    # y = c * x_eski + i = (c / a) * x_yeni + (i - c * b / a)
+    coef = np.array(model.coef_, dtype=np.float64)
+    intercept = float(model.intercept_)
+    for feature, (a, b) in shifts.items():
+        intercept -= coef[feature] * b / a
+        coef[feature] = coef[feature] / a
+    model.coef_ = coef
+    model.intercept_ = intercept
+
+
+def rescale_model(model, shifts):
+    """Modeli, shifts = {sütun_indeksi: (a, b)} ile verilen yeni ölçeklenmiş uzaya yerinde uyarlar."""
+    name = type(model).__name__
+    if name in ('RandomForestRegressor', 'ExtraTreesRegressor', 'DecisionTreeRegressor'):
+        _rescale_sklearn_trees(model, shifts)
+    elif name == 'LGBMRegressor':
+        _rescale_lightgbm(model, shifts)
+    elif name == 'XGBRegressor':
+        _rescale_xgboost(model, shifts)
+    elif hasattr(model, 'coef_'):
+        _rescale_linear(model, shifts)
+    else:
+        raise TypeError(f"Desteklenmeyen model türü: {name}")
+    return model
+
+
+# --- Devam eden boosting ---
+
+def continue_boosting(model, X, y, rounds):
+    """LightGBM/XGBoost modeline X, y üzerinde 'rounds' yeni ağaç ekler; mevcut modeli değiştirmeden yenisini döner."""
+    name = type(model).__name__
+    grown = clone(model).set_params(n_estimators=rounds)
+    if name == 'LGBMRegressor':
+        return grown.fit(X, y, init_model=model.booster_)
+    if name == 'XGBRegressor':
+        return grown.fit(X, y, xgb_model=model.get_booster())
+    raise TypeError(f"Devam eden boosting desteklenmiyor: {name}")
+
+
+def _is_boosted(model):
+    return type(model).__name__ in ('LGBMRegressor', 'XGBRegressor')
+
+
+def oof_meta_features(stacking_model, X, y, rounds, cv=3):
+    """Güncellenmiş temel modellerin yeni satırlar üzerindeki kat dışı tahminleri (n, n_estimators).
+
+    Boosting yapılan modeller için her kat, diğer katlar üzerinde devam eden boosting ile tahmin edilir;
+    değişmeyen modeller yeni satırları hiç görmediğinden doğrudan tahmin eder.
+    """
+    meta = np.empty((len(y), len(stacking_model.estimators_)))
+    folds = list(KFold(n_splits=cv).split(X))
+    for column, model in enumerate(stacking_model.estimators_):
+        if not _is_boosted(model):
+            meta[:, column] = model.predict(X)
+            continue
+        for train_index, test_index in folds:
+            grown = continue_boosting(model, X.iloc[train_index], y[train_index], rounds)
+            meta[test_index, column] = grown.predict(X.iloc[test_index])
+    return meta
+
+
+# --- Sürümler ---
+
+def next_version(base_dir='.'):
+    versions_dir = os.path.join(base_dir, MODEL_VERSIONS_DIR)
+    existing = [int(name[1:]) for name in os.listdir(versions_dir)
+                if re.fullmatch(r'v\d+', name)] if os.path.isdir(versions_dir) else []
+    return f'v{max(existing, default=0) + 1:04d}'
+
+
+def activate_version(version, base_dir='.'):
+    """CURRENT dosyasını verilen sürümü gösterecek şekilde atomik olarak günceller."""
+    path = os.path.join(base_dir, MODEL_VERSIONS_DIR, CURRENT_VERSION_PATH)
+    with open(path + '.part', 'w', encoding='utf-8') as f:
+        f.write(version + '\n')
+    os.replace(path + '.part', path)
+
+
+def update(new_df, base_dir='.', dataset_dir=DATASET_DIR, rounds=DEFAULT_BOOST_ROUNDS, cv=3,
+           meta_window=DEFAULT_META_WINDOW, activate=True, source=None, force=False):
+    """Mevcut sürümü yeni satırlarla günceller ve yeni sürümün adını döner."""
+    start = time.perf_counter()
+    parent = current_version(base_dir)
+    parent_dir = artifact_dir(base_dir)
+    new_df = new_df[COLUMNS_TO_KEEP].astype(RAW_DTYPES)
+    if len(new_df) < 2 * cv:
+        raise ValueError(f"Güncelleme için en az {2 * cv} yeni satır gerekir.")
+
+    # Veri kümesi parçasını hazırla (aynı kaynak daha önce eklendiyse burada durur); eklenmesi en sonda
+    staged = stage_chunks([new_df], dataset_dir, source=source, force=force) if dataset_dir else None
+    try:
+        version, info = _update_model(new_df, base_dir, parent, parent_dir, rounds, cv, meta_window, activate, source,
+                                      start)
+    except BaseException:
+        if staged is not None:
+            staged.discard()
+        raise
+    if staged is not None:
+        staged.commit()
+    return version, info
+
+
+def _update_model(new_df, base_dir, parent, parent_dir, rounds, cv, meta_window, activate, source, start):
+    """Modeli günceller, yeni sürümü yazar ve (activate ise) etkinleştirir; veri kümesine dokunmaz."""
+    model = load_joblib(parent_dir, MODEL_PATH, prefer_mmap=False)
+    lr = load_joblib(parent_dir, LR_PATH, prefer_mmap=False) if os.path.exists(os.path.join(parent_dir, LR_PATH)) else None
+    old_scaler = load_joblib(parent_dir, SCALER_PATH, prefer_mmap=False)
+    original_X_columns = load_joblib(parent_dir, ORIGINAL_X_COLUMNS_PATH)
+    all_descriptions = load_joblib(parent_dir, ALL_DESCRIPTIONS_PATH)
+    numerical_features = load_joblib(parent_dir, NUMERICAL_FEATURES_PATH)
+
+    # Eski modelin yeni satırlardaki başarısı (güncelleme öncesi, tamamen örnek dışı)
+    old_encoder = FeatureEncoder(original_X_columns, all_descriptions, numerical_features, old_scaler)
+    y = new_df[TARGET].to_numpy(dtype=np.float64)
+    r2_before = r2_score(y, model.predict(old_encoder.to_frame(old_encoder.encode_frame(new_df))))
+
+    # Scaler'ı güncelle ve modelleri yeni ölçeğe taşı
+    scaler = copy.deepcopy(old_scaler).partial_fit(new_df[numerical_features])
+    a, b = scaler_shift(old_scaler, scaler)
+    shifts = {int(column): (a[i], b[i]) for i, column in enumerate(old_encoder.numerical_index)}
+    for estimator in model.estimators_:
+        rescale_model(estimator, shifts)
+    if lr is not None:
+        rescale_model(lr, shifts)
+
+    encoder = FeatureEncoder(original_X_columns, all_descriptions, numerical_features, scaler)
+    X = encoder.to_frame(encoder.encode_frame(new_df))
+
+    # Meta-model (ağaç eklemeden önce): yeni satırların kat dışı tahminleri + önceki güncellemelerden kalan son satırlar
+    meta = oof_meta_features(model, X, y, rounds, cv=cv)
+    oof_path = os.path.join(parent_dir, META_OOF_PATH)
+    if os.path.exists(oof_path):
+        previous_meta, previous_y = joblib.load(oof_path)
+        meta = np.vstack([previous_meta, meta])
+        y_meta = np.concatenate([previous_y, y])
+    else:
+        y_meta = y
+    meta, y_meta = meta[-meta_window:], y_meta[-meta_window:]
+    final_estimator = Ridge(alpha=getattr(model.final_estimator_, 'alpha', 1.0)).fit(meta, y_meta)
+
+    # Boosting modellerine tüm yeni satırlarla ağaç ekle
+    estimators = []
+    for (name, _), estimator in zip(model.estimators, model.estimators_):
+        estimators.append(continue_boosting(estimator, X, y, rounds) if _is_boosted(estimator) else estimator)
+    model.estimators_ = estimators
+    model.named_estimators_.update({name: est for (name, _), est in zip(model.estimators, estimators)})
+    model.final_estimator_ = final_estimator
+    r2_after = r2_score(y, model.predict(X))
+
+    # Yeni sürümü yaz
+    version = next_version(base_dir)
+    version_dir = os.path.join(base_dir, MODEL_VERSIONS_DIR, version)
+    os.makedirs(version_dir)
+    dump_artifact(model, os.path.join(version_dir, MODEL_PATH))
+    dump_artifact(scaler, os.path.join(version_dir, SCALER_PATH))
+    dump_artifact(original_X_columns, os.path.join(version_dir, ORIGINAL_X_COLUMNS_PATH))
+    dump_artifact(all_descriptions, os.path.join(version_dir, ALL_DESCRIPTIONS_PATH))
+    dump_artifact(numerical_features, os.path.join(version_dir, NUMERICAL_FEATURES_PATH))
+    if lr is not None:
+        dump_artifact(lr, os.path.join(version_dir, LR_PATH), compress='zlib')
+    dump_artifact((meta, y_meta), os.path.join(version_dir, META_OOF_PATH))
+    write_manifest(MANIFEST_JOBLIBS, version_dir)
+
+    unseen = sorted(set(new_df['description'].dropna().unique()) - set(all_descriptions))
+    info = {
+        'version': version,
+        'parent': parent,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'source': os.path.basename(source) if source else None,
+        'new_rows': len(new_df),
+        'boost_rounds': rounds,
+        'meta_rows': len(y_meta),
+        'r2_new_rows_before': r2_before,
+        'r2_new_rows_after': r2_after,
+        'unseen_descriptions': unseen,
+        'student_dropped': os.path.exists(os.path.join(parent_dir, STUDENT_MODEL_PATH)),
+        'seconds': time.perf_counter() - start,
+    }
+    with open(os.path.join(version_dir, VERSION_INFO_PATH), 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    if activate:
+        activate_version(version, base_dir)
+    return version, info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modeli yeni okumalarla artımlı olarak güncelle")
+    parser.add_argument('--csv', required=True, help="Yeni okumaları içeren CSV dosyası")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--dataset-dir', default=DATASET_DIR, help="Boş bırakılırsa veri kümesine eklenmez")
+    parser.add_argument('--boost-rounds', type=int, default=DEFAULT_BOOST_ROUNDS)
+    parser.add_argument('--cv', type=int, default=3)
+    parser.add_argument('--meta-window', type=int, default=DEFAULT_META_WINDOW)
+    parser.add_argument('--no-activate', action='store_true', help="Yeni sürümü yaz ama CURRENT'ı değiştirme")
+    parser.add_argument('--force', action='store_true', help="Veri kümesine daha önce eklenmiş CSV'yi yine de ekle")
+    args = parser.parse_args()
+
+    new_df = pd.read_csv(args.csv, usecols=COLUMNS_TO_KEEP, dtype=RAW_DTYPES)
+    try:
+        version, info = update(new_df, args.base_dir, args.dataset_dir or None, rounds=args.boost_rounds, cv=args.cv,
+                               meta_window=args.meta_window, activate=not args.no_activate, source=args.csv,
+                               force=args.force)
+    except DuplicateSourceError as e:
+        parser.exit(1, f"{e} Tekrar eklemek için --force kullanın.\n")
+    print(f"Yeni sürüm: {version} (önceki: {info['parent'] or 'kök dizin'}), {info['new_rows']} yeni satır, "
+          f"{info['seconds']:.1f} sn")
+    print(f"Yeni satırlarda R²: güncelleme öncesi {info['r2_new_rows_before']:.4f}, "
+          f"sonrası {info['r2_new_rows_after']:.4f}")
+    if info['unseen_descriptions']:
+        print(f"Uyarı: eğitimde görülmeyen açıklamalar (tümü sıfır kodlanır): {', '.join(info['unseen_descriptions'])}")
+    if info['student_dropped']:
+        print(f"Uyarı: öğrenci model yeni sürüme taşınmadı (stacking modeli değişti); katmanı yeniden sunmak için "
+              f"'python model_distillation.py --base-dir {args.base_dir}' çalıştırın.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""Tahmin yolunun aşama bazında süre ölçümü, Prometheus dışa aktarımı ve yavaş istekler için örnekleyici profilleyici.
+
+Ölçülen aşamalar:
+    scale                   sayısal sütunların ölçeklenmesi (scaler.transform karşılığı)
+    onehot                  açıklama -> one-hot sütunu eşlemesi ve yazımı (get_dummies karşılığı)
+    reindex                 matrisin modelin eğitimdeki sütun düzeniyle DataFrame'e sarılması
+    base/<model>            stacking içindeki her taban model (Random Forest, LightGBM, XGBoost)
+    meta/<model>            meta-model (Ridge)
+    request                 isteğin uçtan uca süresi
+
+Süreler süreç içi histogramlarda tutulur; export_prometheus() Prometheus metin biçimini
+(text/plain; version=0.0.4) üretir.
+
+Profilleyici isteğe bağlıdır: etkinse, profillenen bir istek sürerken yalnızca isteği işleyen iş
+parçacığının (ve verilirse micro-batching dağıtıcısı gibi işi onun adına yapan iş parçacıklarının) yığınları
+sys._current_frames() ile düzenli aralıklarla örneklenir; eşzamanlı diğer istekler ve HTTP kabul döngüsü
+profile karışmaz. İstek eşikten uzun sürerse örnekler flamegraph.pl / speedscope ile açılabilen katlanmış
+yığın (.folded) dosyası olarak yazılır. Başka süreçlerde (ProcessPoolExecutor çalışanları) yapılan iş
+örneklenemez; prediction_service.py bu yüzden profillemeyi --workers ile birlikte kabul etmez.
+
+Kullanım:
+    metrics = StageMetrics()
+    predict_fn = instrumented_predict_fn(model, encoder, metrics)
+    matrix = encoder.encode_arrays(values, descriptions, timer=metrics.timer)
+    predictions = predict_fn(matrix)
+    print(metrics.export_prometheus())
+"""
+import bisect
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+import numpy as np
+
+METRIC_NAME = "energy_inference_stage_seconds"
+
+# Saniye cinsinden histogram kova üst sınırları (tek satırlık tahminden milyonluk partiye kadar)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_SAMPLE_INTERVAL_MS = 5
+DEFAULT_MAX_PROFILES = 100
+
+_FILENAME_PATTERN = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+class Histogram:
+    """Prometheus tarzı, birikimli kovalı süre histogramı."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # son kova: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Kovalar içinde doğrusal aradeğerleme ile yaklaşık yüzdelik (saniye)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+class StageTimer:
+    """with bloğunun süresini sink.observe(stage, saniye) ile bildirir."""
+    __slots__ = ('sink', 'stage', 'start')
+
+    def __init__(self, sink, stage):
+        self.sink = sink
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.sink.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class StageMetrics:
+    """Aşama adı -> Histogram kaydı; iş parçacıkları arasında paylaşılabilir."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_many(self, records):
+        for stage, seconds in records:
+            self.observe(stage, seconds)
+
+    def timer(self, stage):
+        return StageTimer(self, stage)
+
+    def summary(self):
+        """Aşama başına sayı, ortalama ve yaklaşık p50/p99 (ms)."""
+        with self._lock:
+            rows = []
+            for stage, histogram in self._histograms.items():
+                rows.append({
+                    'stage': stage,
+                    'count': histogram.count,
+                    'total_ms': histogram.sum * 1000,
+                    'mean_ms': histogram.sum / histogram.count * 1000,
+                    'p50_ms': histogram.quantile(0.5) * 1000,
+                    'p99_ms': histogram.quantile(0.99) * 1000,
+                })
+        return rows
+
+    def export_prometheus(self, name=METRIC_NAME):
+        """Tüm histogramları Prometheus metin biçiminde döner."""
+        lines = [f"# HELP {name} Tahmin yolunun aşama bazında süresi (saniye).", f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                label = 'stage="{}"'.format(stage.replace('\\', '\\\\').replace('"', '\\"'))
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{{label}}} {histogram.sum:.9g}')
+                lines.append(f'{name}_count{{{label}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class StageRecorder:
+    """Süreleri listeye toplayan hafif kayıtçı; çalışan süreçlerden ana sürece (pickle ile) taşınır."""
+
+    def __init__(self):
+        self.records = []
+
+    def observe(self, stage, seconds):
+        self.records.append((stage, seconds))
+
+    def timer(self, stage):
+        return StageTimer(self, stage)
+
+
+def stacking_stage_names(model):
+    """Stacking modelinin taban model adlarını tahmin sırasıyla döner; stacking değilse None."""
+    names = getattr(model, 'names', None)  # tree_engine.CompiledStackingRegressor
+    if names is None and hasattr(model, 'estimators_') and hasattr(model, 'final_estimator_'):
+        names = [name for name, estimator in model.estimators if estimator != 'drop']
+    return names
+
+
+def timed_predict(model, X, timer):
+    """model.predict(X) ile aynı sonucu döner; stacking modellerinde her taban modeli ve meta-modeli ayrı ölçer."""
+    names = stacking_stage_names(model)
+    if names is None:
+        with timer(f'model/{type(model).__name__}'):
+            return model.predict(X)
+
+    if hasattr(model, 'groups'):
+        # Derlenmiş stacking: taban modeller düz dizilerle, Ridge meta-model matris çarpımıyla çalışır
+        X = np.asarray(X, dtype=np.float64)
+        predictions = []
+        for name, group in zip(names, model.groups):
+            with timer(f'base/{name}'):
+                predictions.append(group.predict(X))
+        meta_features = np.column_stack(predictions)
+        if model.passthrough:
+            meta_features = np.hstack([meta_features, X])
+        with timer(f'meta/{model.meta_name}'):
+            if model._final_estimator is not None:
+                return model._final_estimator.predict(meta_features)
+            return meta_features @ model.coef + model.intercept
+
+    # scikit-learn StackingRegressor.predict ile aynı adımlar (_transform + final_estimator_.predict)
+    predictions = []
+    for name, estimator, method in zip(names, model.estimators_, model.stack_method_):
+        with timer(f'base/{name}'):
+            predictions.append(getattr(estimator, method)(X))
+    meta_features = model._concatenate_predictions(X, predictions)
+    with timer(f'meta/{type(model.final_estimator_).__name__}'):
+        return model.final_estimator_.predict(meta_features)
+
+
+def instrumented_predict_fn(model, encoder, metrics):
+    """PredictionCache ile uyumlu predict_fn(matrix); reindex, taban modeller ve meta-model ölçülür."""
+    def predict(matrix):
+        with metrics.timer('reindex'):
+            frame = encoder.to_frame(matrix)
+        return timed_predict(model, frame, metrics.timer)
+    return predict
+
+
+class _ActiveProfile:
+    __slots__ = ('label', 'thread_ids', 'started', 'samples')
+
+    def __init__(self, label, thread_ids):
+        self.label = label
+        self.thread_ids = thread_ids
+        self.started = time.perf_counter()
+        self.samples = Counter()
+
+
+def _collapse_stack(frame, thread_name):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    stack.append(thread_name)
+    return ';'.join(reversed(stack))
+
+
+class SlowRequestProfiler:
+    """Profillenen istekler sürerken yığınları örnekler; threshold_ms'ten uzun istekleri .folded olarak yazar.
+
+    Örnekleme iş parçacığı yalnızca profillenen bir istek sürerken çalışır; aksi halde bekler.
+    """
+
+    def __init__(self, threshold_ms, output_dir=DEFAULT_PROFILE_DIR, interval_ms=DEFAULT_SAMPLE_INTERVAL_MS,
+                 max_profiles=DEFAULT_MAX_PROFILES):
+        self.threshold = threshold_ms / 1000
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000
+        self.recent = deque(maxlen=max_profiles)  # (etiket, süre ms, dosya yolu)
+        self.profiled = 0
+        self._active = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, name='stage-profiler', daemon=True)
+        self._thread.start()
+
+    def _sample_loop(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                active = list(self._active)
+                if not active:
+                    self._wake.clear()
+            if not active:
+                continue
+            frames = sys._current_frames()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = {}
+            for profile in active:
+                for thread_id in profile.thread_ids:
+                    if thread_id not in stacks:
+                        frame = frames.get(thread_id)
+                        stacks[thread_id] = _collapse_stack(frame, names.get(thread_id, str(thread_id))) if frame else None
+            del frames
+            # Örnekler kilit altında ve yalnızca hâlâ etkin profillere eklenir; _finish biten profili kilit altında
+            # çıkardığı için dosyaya yazılırken sayaç değişmez
+            with self._lock:
+                for profile in active:
+                    if profile not in self._active:
+                        continue
+                    for thread_id in profile.thread_ids:
+                        if stacks[thread_id] is not None:
+                            profile.samples[stacks[thread_id]] += 1
+            time.sleep(self.interval)
+
+    def profile(self, label, extra_threads=()):
+        """Çağıran iş parçacığını (ve extra_threads kimliklerini) örnekleyen bağlam yöneticisi.
+
+        extra_threads isteğin işini onun adına yapan iş parçacıklarıdır (ör. MicroBatcher.thread_id); bunlar
+        paylaşılıyorsa aynı anda profillenen isteklerin her birinde görünür.
+        """
+        return _ProfileContext(self, label, extra_threads)
+
+    def _start(self, label, extra_threads=()):
+        thread_ids = frozenset([threading.get_ident(), *(ident for ident in extra_threads if ident is not None)])
+        profile = _ActiveProfile(label, thread_ids)
+        with self._lock:
+            self._active.add(profile)
+            self._wake.set()
+        return profile
+
+    def _finish(self, profile):
+        with self._lock:
+            self._active.discard(profile)
+            samples = profile.samples.copy()
+        self.profiled += 1
+        seconds = time.perf_counter() - profile.started
+        if seconds < self.threshold or not samples:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        label = _FILENAME_PATTERN.sub('_', profile.label).strip('_') or 'istek'
+        path = os.path.join(self.output_dir, f"{stamp}_{label}_{seconds * 1000:.0f}ms.folded")
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self.recent.append((profile.label, seconds * 1000, path))
+        return path
+
+
+class _ProfileContext:
+    __slots__ = ('profiler', 'label', 'extra_threads', 'profile', 'path')
+
+    def __init__(self, profiler, label, extra_threads=()):
+        self.profiler = profiler
+        self.label = label
+        self.extra_threads = extra_threads
+        self.path = None
+
+    def __enter__(self):
+        self.profile = self.profiler._start(self.label, self.extra_threads)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.path = self.profiler._finish(self.profile)
+        return False
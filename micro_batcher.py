@@ -0,0 +1,221 @@
+"""Eşzamanlı tek satırlık tahmin isteklerini tek bir model.predict çağrısında birleştiren zamanlayıcı.
+
+Stacking modelini satır başına çağırmak her seferinde Python/sklearn çağrı maliyetini (üç temel model
++ Ridge meta-model) öder. MicroBatcher istekleri kısa bir süre (max_wait_ms) veya en fazla
+max_batch_size satır dolana kadar toplar, tek bir predict çağrısı yapar ve her isteğe kendi sonucunu döner.
+
+Karşılaştırmalı ölçüm:
+    python micro_batcher.py --requests 2000 --concurrency 32
+"""
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """predict_fn(numerical_values, descriptions) -> tahmin dizisi fonksiyonunun önünde çalışan istek birleştirici.
+
+    predict_fn tahmin dizisi yerine onu taşıyan bir Future da dönebilir (ör. süreç havuzuna gönderilen iş).
+    Bu durumda dağıtıcı sonucu beklemez: satırların Future'ları add_done_callback ile çözülür ve aynı anda
+    en fazla max_in_flight parti işlemde olur. Tüm yuvalar doluyken gelen istekler kuyrukta birikir ve
+    bir sonraki partiye girer.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 max_in_flight=1):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size en az 1 olmalıdır.")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight en az 1 olmalıdır.")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_in_flight = max_in_flight
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.SimpleQueue()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    @property
+    def thread_id(self):
+        """Dağıtıcı iş parçacığının kimliği (profilleyici bu iş parçacığını da örnekler)."""
+        return self._thread.ident
+
+    def submit(self, numerical_row, description):
+        """Tek bir satırı kuyruğa ekler; tahmin sonucunu taşıyan bir Future döner."""
+        future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher kapatıldı; yeni istek kabul edilmiyor.")
+            self._queue.put((numerical_row, description, future))
+        return future
+
+    def predict(self, numerical_row, description, timeout=None):
+        return self.submit(numerical_row, description).result(timeout)
+
+    @property
+    def mean_batch_size(self):
+        return self.rows / self.batches if self.batches else 0.0
+
+    def close(self):
+        """Kuyruktaki istekleri işler, işlemdeki partilerin bitmesini bekler ve dağıtıcıyı durdurur."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+        for _ in range(self.max_in_flight):
+            self._slots.acquire()
+
+    def _collect(self, first):
+        # İlk istek geldikten sonra pencere süresi boyunca veya parti dolana kadar bekle
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            # Boş yuva yoksa bekle; bu sırada gelen istekler kuyrukta birikip sonraki partiyi büyütür
+            self._slots.acquire()
+            # İstemcinin iptal ettiği istekler partiden çıkarılır; kalanlar RUNNING'e geçer ve artık iptal edilemez
+            batch = [entry for entry in self._collect(item) if entry[2].set_running_or_notify_cancel()]
+            if not batch:
+                self._slots.release()
+                continue
+            futures = [future for _, _, future in batch]
+            self.batches += 1
+            self.rows += len(batch)
+            try:
+                numerical_values = np.asarray([row for row, _, _ in batch], dtype=np.float64)
+                descriptions = [description for _, description, _ in batch]
+                result = self.predict_fn(numerical_values, descriptions)
+            except Exception as e:
+                self._finish(futures, error=e)
+                continue
+            if isinstance(result, Future):
+                result.add_done_callback(lambda done, futures=futures: self._resolve(futures, done))
+            else:
+                self._finish(futures, predictions=result)
+
+    def _resolve(self, futures, done):
+        try:
+            predictions = done.result()
+        except Exception as e:
+            self._finish(futures, error=e)
+            return
+        self._finish(futures, predictions=predictions)
+
+    def _finish(self, futures, predictions=None, error=None):
+        """Partinin yuvasını bırakır ve her satırın Future'ını sonuç veya hata ile tamamlar."""
+        self._slots.release()
+        if error is None and (np.ndim(predictions) != 1 or len(predictions) != len(futures)):
+            error = ValueError(f"predict_fn {len(futures)} satır için {np.size(predictions)} tahmin döndürdü.")
+        if error is not None:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for future, prediction in zip(futures, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+
+def _per_click_predict(model, scaler, original_X_columns, numerical_features, row, description):
+    # Streamlit uygulamasındaki ilk (satır başına) tahmin yolunun birebir kopyası
+    import pandas as pd
+    input_data = pd.DataFrame([[*row, description]],
+                              columns=['current', 'voltage', 'temp', 'pressure', 'humidity', 'speed', 'deg', 'description'])
+    input_encoded = pd.get_dummies(input_data, columns=['description'], dtype='int')
+    final_input = input_encoded.reindex(columns=original_X_columns, fill_value=0)
+    final_input[numerical_features] = scaler.transform(final_input[numerical_features])
+    return model.predict(final_input)[0]
+
+
+def run_benchmark(artifacts, n_requests=2000, concurrency=32, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                  max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    """Satır başına tahmin yolu ile MicroBatcher üzerinden eşzamanlı tahminlerin verimini karşılaştırır."""
+    rng = np.random.default_rng(42)
+    rows = np.column_stack([
+        rng.uniform(0.5, 8.0, n_requests), rng.uniform(110, 135, n_requests), rng.uniform(-5, 40, n_requests),
+        rng.uniform(995, 1035, n_requests), rng.uniform(10, 100, n_requests), rng.uniform(0, 12, n_requests),
+        rng.uniform(0, 360, n_requests),
+    ])
+    descriptions = [artifacts.all_descriptions[i] for i in rng.integers(len(artifacts.all_descriptions), size=n_requests)]
+
+    start = time.perf_counter()
+    for row, description in zip(rows, descriptions):
+        _per_click_predict(artifacts.model, artifacts.scaler, artifacts.original_X_columns,
+                           artifacts.numerical_features, row, description)
+    per_click_seconds = time.perf_counter() - start
+
+    encoder = artifacts.encoder
+
+    def predict_fn(numerical_values, batch_descriptions):
+        matrix = encoder.encode_arrays(numerical_values, batch_descriptions)
+        return artifacts.model.predict(encoder.to_frame(matrix))
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(batcher.predict, rows, descriptions))
+    batched_seconds = time.perf_counter() - start
+    batcher.close()
+
+    return {
+        'requests': n_requests,
+        'per_click_rows_per_second': n_requests / per_click_seconds,
+        'micro_batched_rows_per_second': n_requests / batched_seconds,
+        'speedup': per_click_seconds / batched_seconds,
+        'mean_batch_size': batcher.mean_batch_size,
+    }
+
+
+def main():
+    from model_resources import MODEL_PATH, load_artifacts
+
+    parser = argparse.ArgumentParser(description="Micro-batching tahmin verimi karşılaştırması")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--model-path', default=MODEL_PATH)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    artifacts = load_artifacts(args.base_dir, model_path=args.model_path)
+    stats = run_benchmark(artifacts, args.requests, args.concurrency, args.max_batch_size, args.max_wait_ms)
+    print(f"Satır başına (mevcut uygulama yolu): {stats['per_click_rows_per_second']:,.0f} satır/sn")
+    print(f"Micro-batching:                      {stats['micro_batched_rows_per_second']:,.0f} satır/sn "
+          f"(ortalama parti: {stats['mean_batch_size']:.1f})")
+    print(f"Hızlanma: {stats['speedup']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
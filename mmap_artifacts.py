@@ -0,0 +1,183 @@
+"""Model ve yardımcı dosyaları joblib.load(..., mmap_mode='r') ile açılabilen sıkıştırılmamış biçimde dışa aktarır.
+
+Sıkıştırılmamış joblib dosyalarındaki NumPy dizileri, yükleme sırasında kopyalanmak yerine dosyadan
+bellek eşlemeli (mmap) açılır; aynı dosyayı açan süreçler bu sayfaları işletim sisteminin sayfa
+önbelleği üzerinden paylaşır. Sıkıştırılmış dosyalar (ör. compress='zlib' ile kaydedilen lr.joblib)
+mmap ile açılamaz, her süreçte açılıp kopyalanır.
+
+Not: sklearn'ün Tree nesnesi yüklenirken düğüm dizilerini kendi belleğine kopyalar, LightGBM ve XGBoost
+modelleri de metin/bayt olarak saklanıp yeniden kurulur. Bu yüzden mmap biçimi yükleme süresini kısaltır
+ancak topluluk modelinin süreçler arasında paylaşılmasını tek başına sağlamaz. Paylaşım için modeli ana
+süreçte bir kez yükleyip çalışanları fork ile başlatın (prediction_service.py --preload); rapor bu
+seçeneği de ölçer.
+
+Kullanım:
+    python mmap_artifacts.py --export                # mmap_artifacts/ dizinini oluşturur
+    python mmap_artifacts.py --report --workers 4    # yükleme süresi ve süreç başına RSS/PSS karşılaştırması
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+import joblib
+
+from model_resources import (LR_PATH, MMAP_DIR, MMAP_SOURCES_PATH, MODEL_PATH, NUMERICAL_FEATURES_PATH, REQUIRED_JOBLIBS,
+                             STUDENT_MODEL_PATH, file_signature)
+
+
+def export_mmap_artifacts(base_dir='.', names=None):
+    """Verilen joblib dosyalarını sıkıştırmadan MMAP_DIR altına yeniden kaydeder.
+
+    Kaynak dosyaların boyut/mtime bilgisi sources.json'a yazılır; kaynak değişirse yükleyici
+    eski mmap kopyasını kullanmaz.
+    """
+    out_dir = os.path.join(base_dir, MMAP_DIR)
+    names = names or REQUIRED_JOBLIBS + [LR_PATH, STUDENT_MODEL_PATH]
+    os.makedirs(out_dir, exist_ok=True)
+    sources_path = os.path.join(out_dir, MMAP_SOURCES_PATH)
+    sources = {}
+    if os.path.exists(sources_path):
+        with open(sources_path, encoding='utf-8') as f:
+            sources = json.load(f)
+
+    exported = []
+    for name in names:
+        src_path = os.path.join(base_dir, name)
+        if not os.path.exists(src_path):
+            continue
+        obj = joblib.load(src_path)
+        # Önce geçici dosyaya yaz, sonra taşı: yarım kalan dışa aktarım geçerli görünmesin
+        tmp_path = os.path.join(out_dir, name + '.part')
+        joblib.dump(obj, tmp_path, compress=0, protocol=4)
+        os.replace(tmp_path, os.path.join(out_dir, name))
+        sources[name] = file_signature(src_path)
+        exported.append(name)
+
+    with open(sources_path, 'w', encoding='utf-8') as f:
+        json.dump(sources, f, indent=2)
+    return exported
+
+
+# --- Rapor ---
+
+def _memory_usage_mb():
+    # RSS: süreçte yerleşik tüm sayfalar; PSS: paylaşılan sayfalar süreç sayısına bölünmüş hali;
+    # özel: yalnızca bu sürece ait sayfalar (çalışan başına gerçek bellek maliyeti)
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                usage[key] = int(value.split()[0]) / 1024
+    return {'rss_mb': usage['Rss'], 'pss_mb': usage['Pss'],
+            'private_mb': usage['Private_Clean'] + usage['Private_Dirty']}
+
+
+def _import_model_libraries():
+    # Kütüphane import süresi ve belleği tüm biçimlerde ortak olduğu için ölçüme dahil edilmez
+    import lightgbm  # noqa: F401
+    import sklearn.ensemble  # noqa: F401
+    import xgboost  # noqa: F401
+
+
+def _touch(obj):
+    # Modeli bir kez çalıştır: tembel başlatma ve yazma-anında-kopyalama etkileri ölçüme yansısın
+    n_features = getattr(obj, 'n_features_in_', None)
+    if n_features is not None and hasattr(obj, 'predict'):
+        import numpy as np
+        obj.predict(np.zeros((1, n_features)))
+
+
+# fork ile başlatılan çalışanların devraldığı, ana süreçte yüklenmiş nesne
+_preloaded = None
+
+
+def _measure_worker(path, mmap_mode, barrier, results):
+    import warnings
+    warnings.filterwarnings('ignore')
+    _import_model_libraries()
+    start = time.perf_counter()
+    if path is None:
+        obj = _preloaded
+    else:
+        obj = joblib.load(path, mmap_mode=mmap_mode)
+    load_seconds = time.perf_counter() - start
+    _touch(obj)
+    # Tüm süreçler yüklemeyi bitirdikten sonra ölç ki paylaşılan sayfalar PSS'e yansısın
+    barrier.wait()
+    results.put(dict(load_seconds=load_seconds, **_memory_usage_mb()))
+    barrier.wait()
+
+
+def measure(path, mmap_mode=None, workers=4, preload=False):
+    """path dosyasını 'workers' ayrı süreçte yükler; süreç başına ortalama yükleme süresi ve belleği döner.
+
+    preload=True ise dosya ana süreçte bir kez yüklenir ve çalışanlar fork ile başlatılır.
+    """
+    global _preloaded
+    parent_load_seconds = 0.0
+    if preload:
+        _import_model_libraries()
+        start = time.perf_counter()
+        _preloaded = joblib.load(path, mmap_mode=mmap_mode)
+        parent_load_seconds = time.perf_counter() - start
+        ctx = multiprocessing.get_context('fork')
+        path = None
+    else:
+        ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_measure_worker, args=(path, mmap_mode, barrier, results)) for _ in range(workers)]
+    for p in processes:
+        p.start()
+    rows = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    _preloaded = None
+    stats = {key: sum(row[key] for row in rows) / len(rows) for key in rows[0]}
+    stats['load_seconds'] += parent_load_seconds
+    return stats
+
+
+def report(base_dir='.', workers=4):
+    """Her dosya/biçim için çalışan süreç başına yükleme süresi ve bellek tablosunu yazdırır."""
+    print(f"{workers} çalışan süreç, süreç başına ortalama değerler:")
+    print(f"{'dosya':<34}{'biçim':<24}{'yükleme (ms)':>14}{'RSS (MB)':>11}{'PSS (MB)':>11}{'özel (MB)':>11}")
+
+    def row(name, label, stats):
+        print(f"{name:<34}{label:<24}{stats['load_seconds'] * 1000:>14.1f}{stats['rss_mb']:>11.1f}"
+              f"{stats['pss_mb']:>11.1f}{stats['private_mb']:>11.1f}")
+
+    # Referans: yalnızca kütüphaneleri import etmiş bir çalışan
+    row('-', 'yalnızca kütüphaneler', measure(os.path.join(base_dir, NUMERICAL_FEATURES_PATH), None, workers))
+    for name in [MODEL_PATH, STUDENT_MODEL_PATH, LR_PATH]:
+        original_path = os.path.join(base_dir, name)
+        mmap_path = os.path.join(base_dir, MMAP_DIR, name)
+        if os.path.exists(original_path):
+            row(name, 'mevcut', measure(original_path, None, workers))
+        if os.path.exists(mmap_path):
+            row(name, 'mmap', measure(mmap_path, 'r', workers))
+            row(name, 'mmap + fork (ön yükleme)', measure(mmap_path, 'r', workers, preload=True))
+        elif os.path.exists(original_path):
+            row(name, 'fork (ön yükleme)', measure(original_path, None, workers, preload=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mmap ile yüklenebilen model dosyaları")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--export', action='store_true', help=f"Dosyaları '{MMAP_DIR}/' altına sıkıştırmadan kaydet")
+    parser.add_argument('--report', action='store_true', help="Mevcut ve mmap biçimlerinin yükleme süresi/bellek karşılaştırması")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    if args.export:
+        exported = export_mmap_artifacts(args.base_dir)
+        print(f"Dışa aktarılan dosyalar: {', '.join(exported)}")
+    if args.report:
+        report(args.base_dir, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+"""Stacking modelinin küçük ve hızlı bir öğrenci modele damıtılması ve model katmanlarının karşılaştırma raporu.
+
+Öğrenci, gerçek veri yerine stacking modelinin sentetik bir ızgara üzerindeki tahminleriyle eğitilir:
+yedi sayısal özelliğin (numerical_features) her biri için `levels` düzey ile all_descriptions'taki her
+açıklama (ve eğitimde görülmemiş açıklama) birleştirilir. Aralıklar verilen veri dosyasının
+%0.5-%99.5 yüzdeliklerinden, veri yoksa scaler'dan (ortalama ± 2.5 std) alınır.
+
+Öğrenci türleri:
+    gbm     tek, sığ bir LightGBM modeli; ızgara hücrelerinin içinden rastgele seçilen noktalarla eğitilir
+    table   ızgara düğümlerindeki tahminlerin 16 bitlik nicemlenmiş tablosu; 7 boyutlu çoklu doğrusal
+            aradeğerleme ile tahmin yapar
+
+Öğrenci, diğer katmanlarla aynı kodlanmış özellik matrisini (FeatureEncoder) kullanır ve student_model.joblib
+olarak kaydedilir; damıtıldığı stacking modelinin SHA-256'sı student_model.source.json dosyasına yazılır.
+Uygulama ve servis model katmanını ENERGY_MODEL_TIER / --model-tier ile seçer (stacking, student, linear);
+stacking modeli sonradan değişirse (yeniden eğitim, incremental_update) öğrenci katmanı sunulmaz ve
+öğrencinin bu betikle yeniden damıtılması gerekir.
+
+Rapor, katmanları gerçek veride (training_pipeline ile aynı test ayrımı) R² ve MAE, stacking modeline
+sadakat (R²), tek satır gecikmesi, 10.000 satırlık parti verimi ve dosya/bellek boyutu ile karşılaştırır.
+
+Kullanım:
+    python model_distillation.py --data energy_weather_raw_data.csv --student gbm
+    python model_distillation.py --data energy_weather_raw_data.csv --student table --levels 6
+    python model_distillation.py --data energy_weather_raw_data.csv --report-only
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import cached_sha256, write_manifest
+from benchmark_suite import time_call
+from model_resources import (DEFAULT_MODEL_TIER, MODEL_PATH, MODEL_TIERS, STUDENT_MODEL_PATH, STUDENT_SOURCE_PATH,
+                             artifact_dir, load_artifacts, load_joblib, student_is_current)
+from training_pipeline import COLUMNS_TO_KEEP, RAW_DATA_PATH, TARGET, dump_artifact
+
+STUDENT_TYPES = ('gbm', 'table')
+# Özellik başına ızgara düzeyi: gbm için levels^7 hücre, table için levels^7 düğüm (açıklama başına)
+DEFAULT_LEVELS = {'gbm': 5, 'table': 6}
+DEFAULT_REPORT_PATH = "distillation_report.json"
+DEFAULT_EVAL_ROWS = 100_000
+
+GRID_QUANTILES = (0.005, 0.995)
+SCALER_RANGE = 2.5
+# Stacking modeli ızgarayı bu büyüklükte parçalarla etiketler (bellek sınırı)
+LABEL_CHUNK_SIZE = 200_000
+# Sentetik sadakat ölçümü için ızgaradan bağımsız rastgele nokta sayısı
+HOLDOUT_ROWS = 20_000
+
+STUDENT_GBM_PARAMS = {'n_estimators': 400, 'num_leaves': 31, 'max_depth': 6, 'learning_rate': 0.1,
+                      'min_child_samples': 20}
+
+
+# --- Sentetik ızgara ---
+
+def feature_ranges(encoder, df=None):
+    """Sayısal özellik başına (alt, üst) aralık; ham birimlerde."""
+    ranges = {}
+    for i, name in enumerate(encoder.numerical_features):
+        if df is not None:
+            low, high = df[name].quantile(GRID_QUANTILES)
+        else:
+            low = encoder.mean[i] - SCALER_RANGE * encoder.scale[i]
+            high = encoder.mean[i] + SCALER_RANGE * encoder.scale[i]
+        ranges[name] = (float(low), float(high))
+    return ranges
+
+
+def grid_values(ranges, numerical_features, levels, rng=None):
+    """levels^7 satırlık ham değer matrisi.
+
+    rng verilmezse düğümler (her aralıkta levels eşit aralıklı değer); verilirse her hücrenin içinden
+    rastgele bir nokta (katmanlı örnekleme).
+    """
+    axes = [np.arange(levels)] * len(numerical_features)
+    cells = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(numerical_features))
+    low = np.array([ranges[name][0] for name in numerical_features])
+    high = np.array([ranges[name][1] for name in numerical_features])
+    if rng is None:
+        return low + cells / (levels - 1) * (high - low)
+    return low + (cells + rng.random(cells.shape)) / levels * (high - low)
+
+
+def grid_descriptions(encoder):
+    # Model sütunu olan açıklamalar (kodlayıcı sırasıyla) ve None: eğitimde görülmemiş açıklama (tüm one-hot sütunları sıfır)
+    return list(encoder.description_index) + [None]
+
+
+def encode_grid(encoder, values, descriptions):
+    """Her açıklama için aynı sayısal ızgarayı kodlayıp alt alta dizer."""
+    n_rows = len(values)
+    matrix = encoder.allocate(n_rows * len(descriptions))
+    for i, description in enumerate(descriptions):
+        encoder.encode_arrays(values, [description] * n_rows, out=matrix[i * n_rows:(i + 1) * n_rows])
+    return matrix
+
+
+def predict_in_chunks(model, encoder, matrix, chunk_size=LABEL_CHUNK_SIZE):
+    return np.concatenate([model.predict(encoder.to_frame(matrix[start:start + chunk_size]))
+                           for start in range(0, len(matrix), chunk_size)])
+
+
+# --- Öğrenci modeller ---
+
+class QuantizedLookupTable:
+    """Izgara düğümlerindeki tahminlerin uint16 tablosu; kodlanmış matristen çoklu doğrusal aradeğerleme ile tahmin.
+
+    Aralık dışındaki değerler ızgaranın kenarına kırpılır.
+    """
+
+    # Aradeğerleme (n, 2^7) ağırlık matrisiyle yapılır; büyük partiler bu boyutta parçalara bölünür
+    PREDICT_CHUNK_SIZE = 50_000
+
+    def __init__(self, encoder, levels, values):
+        self.columns = list(encoder.columns)
+        self.n_features_in_ = len(self.columns)
+        self.numerical_index = encoder.numerical_index
+        # Tablonun ilk ekseni grid_descriptions(encoder) sırasıdır; son satır bilinmeyen açıklama
+        self.description_columns = np.array(list(encoder.description_index.values()), dtype=np.intp)
+        # Düzeyler kodlanmış (ölçeklenmiş) uzayda tutulur
+        self.levels = [np.asarray(level, dtype=np.float64) for level in levels]
+        values = np.asarray(values, dtype=np.float64)
+        self.low = float(values.min())
+        self.step = max(float(values.max()) - self.low, 1e-12) / np.iinfo(np.uint16).max
+        self.codes = np.round((values - self.low) / self.step).astype(np.uint16)
+
+        strides = np.array(self.codes.strides) // self.codes.itemsize
+        self._description_stride = int(strides[0])
+        self._strides = strides[1:]
+        n_dims = len(self.levels)
+        # c. köşe: d. boyutta (c >> d) & 1 ise üst düğüm
+        bits = (np.arange(2 ** n_dims)[:, None] >> np.arange(n_dims)) & 1
+        self._corner_offsets = bits @ self._strides
+
+    def _predict_chunk(self, X):
+        flat = self.codes.reshape(-1)
+        onehot = X[:, self.description_columns]
+        description = np.where(onehot.any(axis=1), onehot.argmax(axis=1), len(self.description_columns))
+        base = description * self._description_stride
+        weights = np.ones((len(X), 1))
+        for d, level in enumerate(self.levels):
+            x = np.clip(X[:, self.numerical_index[d]], level[0], level[-1])
+            lower = np.clip(np.searchsorted(level, x, side='right') - 1, 0, len(level) - 2)
+            t = (x - level[lower]) / (level[lower + 1] - level[lower])
+            base = base + lower * self._strides[d]
+            weights = np.concatenate([weights * (1 - t)[:, None], weights * t[:, None]], axis=1)
+        corners = flat[base[:, None] + self._corner_offsets[None, :]]
+        return self.low + self.step * np.einsum('ij,ij->i', weights, corners)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Girdi {self.n_features_in_} sütun içermelidir.")
+        return np.concatenate([self._predict_chunk(X[start:start + self.PREDICT_CHUNK_SIZE])
+                               for start in range(0, len(X), self.PREDICT_CHUNK_SIZE)] or [np.empty(0)])
+
+
+def train_student(stacker, encoder, ranges, student='gbm', levels=None, random_state=42):
+    """Stacking modelinin ızgara üzerindeki tahminlerinden öğrenci model eğitir; (model, bilgi) döner."""
+    if student not in STUDENT_TYPES:
+        raise ValueError(f"Bilinmeyen öğrenci türü: {student} (seçenekler: {', '.join(STUDENT_TYPES)})")
+    levels = levels or DEFAULT_LEVELS[student]
+    descriptions = grid_descriptions(encoder)
+    rng = np.random.default_rng(random_state)
+
+    start = time.perf_counter()
+    values = grid_values(ranges, encoder.numerical_features, levels, rng=rng if student == 'gbm' else None)
+    matrix = encode_grid(encoder, values, descriptions)
+    labels = predict_in_chunks(stacker, encoder, matrix)
+    label_seconds = time.perf_counter() - start
+    print(f"Izgara: {len(matrix):,} satır ({levels}^{len(encoder.numerical_features)} x {len(descriptions)} açıklama), "
+          f"stacking ile etiketleme {label_seconds:.1f} sn")
+
+    start = time.perf_counter()
+    if student == 'gbm':
+        import lightgbm as lgb
+
+        model = lgb.LGBMRegressor(random_state=random_state, **STUDENT_GBM_PARAMS)
+        model.fit(encoder.to_frame(matrix), labels)
+    else:
+        scaled_levels = [(np.linspace(*ranges[name], levels) - encoder.mean[i]) / encoder.scale[i]
+                         for i, name in enumerate(encoder.numerical_features)]
+        table_shape = (len(descriptions),) + (levels,) * len(encoder.numerical_features)
+        model = QuantizedLookupTable(encoder, scaled_levels, labels.reshape(table_shape))
+    train_seconds = time.perf_counter() - start
+    print(f"Öğrenci ({student}) {train_seconds:.1f} sn'de oluşturuldu.")
+    return model, {'student': student, 'levels': levels, 'grid_rows': len(matrix), 'label_seconds': label_seconds,
+                   'train_seconds': train_seconds, 'ranges': ranges}
+
+
+def write_student_source(base_dir, distillation):
+    """Öğrencinin hangi stacking modelinden (SHA-256) ve nasıl damıtıldığını öğrencinin yanına yazar."""
+    source = {key: distillation[key] for key in ('source_sha256', 'student', 'levels')}
+    source['created'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    with open(os.path.join(base_dir, STUDENT_SOURCE_PATH), 'w', encoding='utf-8') as f:
+        json.dump(source, f, indent=2)
+        f.write('\n')
+
+
+# --- Rapor ---
+
+def load_evaluation_data(data_path, test_size=0.2, random_state=42, max_rows=DEFAULT_EVAL_ROWS):
+    """training_pipeline ile aynı train_test_split ayrımının test kısmı (en çok max_rows satır)."""
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_csv(data_path, usecols=COLUMNS_TO_KEEP)
+    _, test_df = train_test_split(df, test_size=test_size, random_state=random_state)
+    if max_rows and len(test_df) > max_rows:
+        test_df = test_df.sample(max_rows, random_state=random_state)
+    return df, test_df
+
+
+def _r2(y_true, y_pred):
+    from sklearn.metrics import r2_score
+    return float(r2_score(y_true, y_pred))
+
+
+def _mae(y_true, y_pred):
+    from sklearn.metrics import mean_absolute_error
+    return float(mean_absolute_error(y_true, y_pred))
+
+
+def compare_tiers(models, encoder, base_dir, eval_matrix, y_true=None, holdout_matrix=None):
+    """Katman başına doğruluk, stacking modeline sadakat, gecikme ve boyut ölçümleri."""
+    reference = models.get('stacking')
+    reference_eval = reference_holdout = None
+    if reference is not None:
+        reference_eval = predict_in_chunks(reference, encoder, eval_matrix)
+        if holdout_matrix is not None:
+            reference_holdout = predict_in_chunks(reference, encoder, holdout_matrix)
+
+    one_row = encoder.to_frame(eval_matrix[:1])
+    batch = encoder.to_frame(eval_matrix[:10_000])
+    results = {}
+    for tier, model in models.items():
+        predictions = predict_in_chunks(model, encoder, eval_matrix)
+        row_seconds, _ = time_call(lambda: model.predict(one_row))
+        batch_seconds, _ = time_call(lambda: model.predict(batch), min_repeats=1)
+        path = os.path.join(base_dir, MODEL_TIERS[tier])
+        result = {
+            'latency_ms': row_seconds * 1000,
+            'batch_rows_per_second': len(batch) / batch_seconds,
+            'file_bytes': os.path.getsize(path) if os.path.exists(path) else None,
+            'pickled_bytes': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+        }
+        if y_true is not None:
+            result['r2'] = _r2(y_true, predictions)
+            result['mae'] = _mae(y_true, predictions)
+        if reference_eval is not None:
+            result['fidelity_r2'] = _r2(reference_eval, predictions)
+            if reference_holdout is not None:
+                result['fidelity_r2_synthetic'] = _r2(reference_holdout, predict_in_chunks(model, encoder, holdout_matrix))
+        results[tier] = result
+    return results
+
+
+def print_report(results):
+    columns = [('R²', 'r2', 9, '.4f'), ('MAE', 'mae', 10, '.3f'), ('sadakat R²', 'fidelity_r2', 12, '.4f'),
+               ('sentetik', 'fidelity_r2_synthetic', 10, '.4f'), ('1 satır (ms)', 'latency_ms', 14, '.3f'),
+               ('satır/sn', 'batch_rows_per_second', 14, ',.0f'), ('dosya (MB)', 'file_mb', 12, '.2f'),
+               ('bellek (MB)', 'pickled_mb', 13, '.2f')]
+    print(f"{'katman':<10}" + ' '.join(f"{title:>{width}}" for title, _, width, _ in columns))
+    for tier, result in results.items():
+        result = dict(result, pickled_mb=result['pickled_bytes'] / 2**20,
+                      file_mb=result['file_bytes'] / 2**20 if result['file_bytes'] is not None else None)
+        cells = [f"{result[key]:>{width}{spec}}" if result.get(key) is not None else f"{'-':>{width}}"
+                 for _, key, width, spec in columns]
+        print(f"{tier:<10}" + ' '.join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stacking modelini küçük bir öğrenci modele damıt ve katmanları karşılaştır")
+    parser.add_argument('--base-dir', default='.', help="Model ve joblib dosyalarının bulunduğu dizin (etkin sürüm kullanılır)")
+    parser.add_argument('--data', default=RAW_DATA_PATH,
+                        help="Izgara aralıkları ve R²/MAE için ham veri (yoksa yalnızca sadakat ölçülür)")
+    parser.add_argument('--student', choices=STUDENT_TYPES, default='gbm')
+    parser.add_argument('--levels', type=int, default=None,
+                        help=f"Özellik başına ızgara düzeyi (varsayılan: gbm {DEFAULT_LEVELS['gbm']}, table {DEFAULT_LEVELS['table']})")
+    parser.add_argument('--eval-rows', type=int, default=DEFAULT_EVAL_ROWS)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH, help="JSON raporunun yazılacağı dosya")
+    parser.add_argument('--report-only', action='store_true', help="Öğrenci eğitme; mevcut katmanları karşılaştır")
+    args = parser.parse_args()
+
+    base_dir = artifact_dir(args.base_dir)
+    artifacts = load_artifacts(base_dir)
+    encoder = artifacts.encoder
+
+    df = test_df = None
+    if args.data and os.path.exists(args.data):
+        df, test_df = load_evaluation_data(args.data, args.test_size, args.random_state, args.eval_rows)
+    else:
+        print(f"'{args.data}' bulunamadı: aralıklar scaler'dan alınır, R²/MAE yerine yalnızca sadakat raporlanır.")
+    ranges = feature_ranges(encoder, df)
+    del df
+
+    distillation = None
+    if not args.report_only:
+        student, distillation = train_student(artifacts.model, encoder, ranges, args.student, args.levels,
+                                              args.random_state)
+        distillation['source_sha256'] = cached_sha256(os.path.join(base_dir, MODEL_PATH))
+        dump_artifact(student, os.path.join(base_dir, STUDENT_MODEL_PATH))
+        write_student_source(base_dir, distillation)
+        write_manifest([STUDENT_MODEL_PATH], base_dir)
+        print(f"Öğrenci model '{os.path.join(base_dir, STUDENT_MODEL_PATH)}' dosyasına kaydedildi.")
+
+    models = {}
+    for tier, filename in MODEL_TIERS.items():
+        if tier == DEFAULT_MODEL_TIER:
+            models[tier] = artifacts.model
+        elif tier == 'student' and os.path.exists(os.path.join(base_dir, filename)) and not student_is_current(base_dir):
+            print("Öğrenci model güncel stacking modelinden damıtılmamış; karşılaştırmaya alınmadı (--report-only olmadan yeniden damıtın).")
+        elif os.path.exists(os.path.join(base_dir, filename)):
+            models[tier] = load_joblib(base_dir, filename)
+
+    rng = np.random.default_rng(args.random_state + 1)
+    holdout_values = np.column_stack([rng.uniform(*ranges[name], HOLDOUT_ROWS) for name in encoder.numerical_features])
+    descriptions = grid_descriptions(encoder)
+    holdout_matrix = encoder.encode_arrays(holdout_values, [descriptions[i] for i in rng.integers(len(descriptions), size=HOLDOUT_ROWS)])
+    if test_df is not None:
+        eval_matrix = encoder.encode_frame(test_df)
+        y_true = test_df[TARGET].to_numpy(dtype=np.float64)
+    else:
+        eval_matrix, y_true = holdout_matrix, None
+
+    results = compare_tiers(models, encoder, base_dir, eval_matrix, y_true, holdout_matrix)
+    print()
+    print_report(results)
+
+    report = {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'base_dir': base_dir, 'eval_rows': len(eval_matrix),
+              'distillation': distillation, 'tiers': results}
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print(f"\nRapor '{args.report}' dosyasına yazıldı.")
+
+
+if __name__ == '__main__':
+    main()
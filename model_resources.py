@@ -0,0 +1,185 @@
+import json
+import os
+from collections import namedtuple
+
+# joblib ve FeatureEncoder (pandas) fonksiyonların içinde import edilir: Streamlit uygulaması sürüm bilgisini
+# ve dosya yollarını ağır kütüphaneleri yüklemeden okuyabilsin
+
+# Ana model dosyası (Google Drive'dan indirilir) ve yerelde bulunan yardımcı joblib dosyaları
+MODEL_PATH = "stacking_regressor_model.joblib"
+SCALER_PATH = "scaler.joblib"
+ORIGINAL_X_COLUMNS_PATH = "original_X_columns.joblib"
+ALL_DESCRIPTIONS_PATH = "all_descriptions.joblib"
+NUMERICAL_FEATURES_PATH = "numerical_features.joblib"
+
+REQUIRED_JOBLIBS = [
+    MODEL_PATH,
+    SCALER_PATH,
+    ORIGINAL_X_COLUMNS_PATH,
+    ALL_DESCRIPTIONS_PATH,
+    NUMERICAL_FEATURES_PATH,
+]
+
+# Model katmanları: tam stacking modeli, model_distillation.py ile damıtılmış küçük öğrenci model ve
+# notebook'taki doğrusal regresyon. Hepsi aynı kodlanmış özellik matrisini (FeatureEncoder) kullanır.
+LR_PATH = "lr.joblib"
+STUDENT_MODEL_PATH = "student_model.joblib"
+MODEL_TIERS = {
+    'stacking': MODEL_PATH,
+    'student': STUDENT_MODEL_PATH,
+    'linear': LR_PATH,
+}
+DEFAULT_MODEL_TIER = 'stacking'
+# Manifeste checksum'ı yazılan dosyalar: katman modelleri de ensure_artifacts ile doğrulanabilsin
+MANIFEST_JOBLIBS = REQUIRED_JOBLIBS + [LR_PATH, STUDENT_MODEL_PATH]
+# model_distillation.py öğrencinin damıtıldığı stacking modelinin SHA-256'sını buraya yazar; stacking modeli
+# sonradan değişirse (yeniden eğitim, incremental_update) eski öğrenci katmanı sunulmaz
+STUDENT_SOURCE_PATH = "student_model.source.json"
+MODEL_TIER_ENV = "ENERGY_MODEL_TIER"
+
+# mmap_artifacts.py tarafından oluşturulan, sıkıştırılmamış (mmap ile açılabilen) kopyaların dizini
+MMAP_DIR = "mmap_artifacts"
+MMAP_SOURCES_PATH = "sources.json"
+
+# incremental_update.py tarafından yazılan sürümlü artifact setleri; CURRENT etkin sürümün adını tutar
+MODEL_VERSIONS_DIR = "model_versions"
+CURRENT_VERSION_PATH = "CURRENT"
+
+ModelArtifacts = namedtuple(
+    'ModelArtifacts',
+    ['model', 'scaler', 'original_X_columns', 'all_descriptions', 'numerical_features', 'encoder'],
+)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _mmap_is_current(base_dir, name):
+    # mmap kopyası yalnızca dışa aktarıldığı kaynak dosya değişmediyse kullanılır
+    try:
+        with open(os.path.join(base_dir, MMAP_DIR, MMAP_SOURCES_PATH), encoding='utf-8') as f:
+            sources = json.load(f)
+        return sources.get(name) == file_signature(os.path.join(base_dir, name))
+    except (OSError, ValueError):
+        return False
+
+
+def current_version(base_dir='.'):
+    """Etkin model sürümünün adını (ör. 'v0003') döner; sürüm yoksa None (kök dizindeki dosyalar kullanılır)."""
+    try:
+        with open(os.path.join(base_dir, MODEL_VERSIONS_DIR, CURRENT_VERSION_PATH), encoding='utf-8') as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version if version and os.path.isdir(os.path.join(base_dir, MODEL_VERSIONS_DIR, version)) else None
+
+
+def artifact_dir(base_dir='.', version=None):
+    """Verilen (veya etkin) sürümün artifact dizini; sürüm yoksa base_dir."""
+    version = version or current_version(base_dir)
+    return os.path.join(base_dir, MODEL_VERSIONS_DIR, version) if version else base_dir
+
+
+def tier_joblibs(tier=DEFAULT_MODEL_TIER):
+    """Verilen model katmanı için gereken joblib dosyaları (REQUIRED_JOBLIBS, ana model yerine katmanın modeliyle)."""
+    if tier not in MODEL_TIERS:
+        raise ValueError(f"Bilinmeyen model katmanı: {tier} (seçenekler: {', '.join(MODEL_TIERS)})")
+    return [MODEL_TIERS[tier] if name == MODEL_PATH else name for name in REQUIRED_JOBLIBS]
+
+
+def load_joblib(base_dir, name, prefer_mmap=True):
+    """Güncel bir mmap kopyası varsa dosyayı bellek eşlemeli (mmap_mode='r'), yoksa normal joblib.load ile yükler."""
+    import joblib
+
+    mmap_path = os.path.join(base_dir, MMAP_DIR, name)
+    if prefer_mmap and os.path.exists(mmap_path) and _mmap_is_current(base_dir, name):
+        return joblib.load(mmap_path, mmap_mode='r')
+    return joblib.load(os.path.join(base_dir, name))
+
+
+def load_encoder(base_dir='.'):
+    """Modeli yüklemeden yalnızca yardımcı dosyalardan FeatureEncoder kurar."""
+    from feature_encoder import FeatureEncoder
+
+    return FeatureEncoder(load_joblib(base_dir, ORIGINAL_X_COLUMNS_PATH), load_joblib(base_dir, ALL_DESCRIPTIONS_PATH),
+                          load_joblib(base_dir, NUMERICAL_FEATURES_PATH), load_joblib(base_dir, SCALER_PATH))
+
+
+def load_artifacts(base_dir='.', model_path=MODEL_PATH):
+    """Streamlit'e bağlı olmadan modeli ve yardımcı dosyaları yükler (servis ve betikler için)."""
+    from feature_encoder import FeatureEncoder
+
+    loaded = {}
+    for filename in REQUIRED_JOBLIBS:
+        name = model_path if filename == MODEL_PATH else filename
+        path = os.path.join(base_dir, name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"'{path}' dosyası bulunamadı.")
+        loaded[filename] = load_joblib(base_dir, name)
+
+    scaler = loaded[SCALER_PATH]
+    original_X_columns = loaded[ORIGINAL_X_COLUMNS_PATH]
+    all_descriptions = loaded[ALL_DESCRIPTIONS_PATH]
+    numerical_features = loaded[NUMERICAL_FEATURES_PATH]
+    encoder = FeatureEncoder(original_X_columns, all_descriptions, numerical_features, scaler)
+    return ModelArtifacts(loaded[MODEL_PATH], scaler, original_X_columns, all_descriptions, numerical_features, encoder)
+
+
+def student_source(base_dir='.'):
+    """Öğrencinin damıtıldığı stacking modelinin bilgisi ({'source_sha256': ...}); kayıt yoksa None."""
+    try:
+        with open(os.path.join(base_dir, STUDENT_SOURCE_PATH), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def stacker_sha256(base_dir='.'):
+    """Dizindeki etkin stacking modelinin SHA-256'sı: önce manifestten, yoksa yerel dosyadan; ikisi de yoksa None."""
+    from artifact_store import MANIFEST_PATH, cached_sha256, load_manifest
+
+    expected = load_manifest(os.path.join(base_dir, MANIFEST_PATH)).get(MODEL_PATH, {}).get('sha256')
+    if expected:
+        return expected
+    stacker_path = os.path.join(base_dir, MODEL_PATH)
+    return cached_sha256(stacker_path) if os.path.exists(stacker_path) else None
+
+
+def student_is_current(base_dir='.'):
+    """Öğrenci model var ve dizindeki güncel stacking modelinden damıtıldıysa True.
+
+    Stacking modeli yerelde olmasa da (yalnızca öğrenciyle çalışan servis) manifestteki checksum ile karşılaştırılır.
+    """
+    source = student_source(base_dir)
+    if source is None or not os.path.exists(os.path.join(base_dir, STUDENT_MODEL_PATH)):
+        return False
+    current = stacker_sha256(base_dir)
+    return current is not None and source.get('source_sha256') == current
+
+
+def tier_is_ready(tier, base_dir='.'):
+    """Katmanın modeli yerelde var ve ensure_artifacts'ın kabul edeceği şekilde doğrulanıyorsa True.
+
+    Manifestte checksum'ı (veya geçerli '.verified' damgası) olmayan dosya ensure_artifacts'ta yeniden
+    indirilmeye çalışılır; indirme adresi de yoksa katman yüklenemez, bu yüzden sunulmaz.
+    """
+    from artifact_store import MANIFEST_PATH, is_verified, load_manifest
+
+    filename = MODEL_TIERS[tier]
+    expected = load_manifest(os.path.join(base_dir, MANIFEST_PATH)).get(filename, {}).get('sha256')
+    return is_verified(os.path.join(base_dir, filename), expected)
+
+
+def available_tiers(base_dir='.'):
+    """Sunulabilecek katmanlar: stacking her zaman, diğerleri dosyası doğrulanabiliyorsa (öğrenci ayrıca güncelse)."""
+    tiers = []
+    for tier in MODEL_TIERS:
+        if tier == DEFAULT_MODEL_TIER:
+            tiers.append(tier)
+        elif not tier_is_ready(tier, base_dir):
+            continue
+        elif tier != 'student' or student_is_current(base_dir):
+            tiers.append(tier)
+    return tiers
@@ -0,0 +1,165 @@
+"""Nicemlenmiş (quantized) girişlere göre anahtarlanan, LRU/TTL tahliyeli tahmin önbelleği.
+
+Sensörler çoğu zaman neredeyse aynı okumaları gönderir. Önbellek anahtarı kodlanmış özellik vektörüdür:
+her sayısal özellik kendi ham birimindeki hassasiyete göre (ör. voltaj 0.1 V) nicemlenir, açıklama
+one-hot sütunuyla temsil edilir. Kaçırmalarda model kullanıcının girdiği tam değerlerle çalıştırılır ve
+sonuç o kutu için saklanır: önbellekte olmayan bir okumanın tahmini önbelleksiz yolla birebir aynıdır; aynı
+kutuya sonradan (veya aynı partide) düşen okumalar bu ilk tahmini alır. Sonlu olmayan (NaN/inf) değer
+içeren satırlar anlamlı bir kutuya düşmediği için reddedilir (ValueError).
+
+Bellek kullanımı max_size ile sınırlıdır (en az kullanılan girdi tahliye edilir); isteğe bağlı ttl
+saniyesinden eski girdiler kullanılmaz.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+# Sayısal özellikler için ham birimlerde varsayılan nicemleme adımları
+DEFAULT_PRECISION = {
+    'current': 0.01,
+    'voltage': 0.1,
+    'temp': 0.1,
+    'pressure': 1.0,
+    'humidity': 1.0,
+    'speed': 0.1,
+    'deg': 1.0,
+}
+
+DEFAULT_MAX_SIZE = 100_000
+
+
+class PredictionCache:
+    """predict_fn(encoded_matrix) -> tahmin dizisi fonksiyonunun önünde çalışan önbellek."""
+
+    def __init__(self, predict_fn, encoder, precision=None, max_size=DEFAULT_MAX_SIZE, ttl=None):
+        if max_size < 1:
+            raise ValueError("max_size en az 1 olmalıdır.")
+        self.predict_fn = predict_fn
+        self.encoder = encoder
+        self.max_size = max_size
+        self.ttl = ttl
+
+        precision = {**DEFAULT_PRECISION, **(precision or {})}
+        raw_steps = np.array([precision[name] for name in encoder.numerical_features], dtype=np.float64)
+        if np.any(raw_steps <= 0):
+            raise ValueError("Nicemleme hassasiyetleri pozitif olmalıdır.")
+        # Kodlanmış (ölçeklenmiş) uzaydaki adım: ham adım / scaler ölçeği
+        self._steps = raw_steps / encoder.scale
+        self._numerical_index = encoder.numerical_index
+        self._description_mask = np.ones(encoder.n_features, dtype=bool)
+        self._description_mask[self._numerical_index] = False
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _quantize(self, matrix):
+        numerical = matrix[:, self._numerical_index]
+        finite = np.isfinite(numerical).all(axis=1)
+        if not finite.all():
+            rows = np.flatnonzero(~finite)
+            raise ValueError(f"Önbellek sonlu olmayan (NaN/inf) değer içeren satırları kabul etmez: "
+                             f"{', '.join(str(i) for i in rows[:10])}{' ...' if len(rows) > 10 else ''}")
+        bins = np.round(numerical / self._steps).astype(np.int64)
+        # Açıklama one-hot sütunları zaten 0/1; anahtara bit maskesi olarak eklenir
+        descriptions = matrix[:, self._description_mask].astype(np.int8)
+        return bins, descriptions
+
+    def predict_matrix(self, matrix):
+        """Kodlanmış matrisin her satırı için tahmin döner; yalnızca önbellekte olmayan satırlar modele gider."""
+        predictions, missing, representative, now = self._lookup(matrix)
+        if missing:
+            self._fill(predictions, missing, self.predict_fn(representative), now)
+        return predictions
+
+    def submit_matrix(self, matrix, submit_fn):
+        """predict_matrix'in beklemeyen karşılığı: eksik satırlar submit_fn(matrix) -> Future ile hesaplanır.
+
+        Tahmin dizisini taşıyan bir Future döner (MicroBatcher'ın süreç havuzu yolu).
+        """
+        predictions, missing, representative, now = self._lookup(matrix)
+        result = Future()
+        if not missing:
+            result.set_result(predictions)
+            return result
+
+        def done(future):
+            try:
+                self._fill(predictions, missing, future.result(), now)
+            except Exception as e:
+                result.set_exception(e)
+                return
+            result.set_result(predictions)
+
+        submit_fn(representative).add_done_callback(done)
+        return result
+
+    def _lookup(self, matrix):
+        """Önbellekteki satırları doldurur; (tahminler, {anahtar: satırlar}, modele gidecek matris, zaman) döner."""
+        matrix = np.asarray(matrix)
+        bins, descriptions = self._quantize(matrix)
+        keys = [b.tobytes() + d.tobytes() for b, d in zip(bins, descriptions)]
+        predictions = np.empty(len(keys), dtype=np.float64)
+
+        now = time.monotonic()
+        missing = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl is not None and now - entry[1] > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    missing.setdefault(key, []).append(i)
+                    continue
+                self._entries.move_to_end(key)
+                predictions[i] = entry[0]
+                self.hits += 1
+            self.misses += sum(len(rows) for rows in missing.values())
+
+        representative = None
+        if missing:
+            # Her benzersiz kutu için model bir kez, kutunun partideki ilk satırının tam değerleriyle çalıştırılır
+            first_rows = [rows[0] for rows in missing.values()]
+            representative = matrix[first_rows].astype(self.encoder.dtype, copy=True)
+        return predictions, missing, representative, now
+
+    def _fill(self, predictions, missing, computed, now):
+        computed = np.asarray(computed, dtype=np.float64)
+        if computed.shape != (len(missing),):
+            raise ValueError(f"predict_fn {len(missing)} satır için {computed.size} tahmin döndürdü.")
+        with self._lock:
+            for (key, rows), value in zip(missing.items(), computed):
+                predictions[rows] = value
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
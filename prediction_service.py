@@ -0,0 +1,497 @@
+"""Streamlit arayüzünden bağımsız, düşük gecikmeli HTTP/JSON tahmin servisi.
+
+Kullanım:
+    python prediction_service.py --port 8600 --workers 4
+    python prediction_service.py --port 8600 --workers 4 --preload
+    python prediction_service.py --benchmark --requests 2000 --concurrency 16
+    python prediction_service.py --max-batch-size 64 --batch-window-ms 2
+    python prediction_service.py --profile-slow-ms 50 --profile-dir profiles
+    python prediction_service.py --model-tier student    # bkz. model_distillation.py
+
+Uç noktalar:
+    POST /predict        {"current": 2.53, "voltage": 122.2, ..., "description": "clear sky"}
+    POST /predict/batch  {"rows": [{...}, {...}]}
+    GET  /metrics        p50/p99 gecikme, saniyedeki istek/satır sayısı ve aşama bazında süreler
+    GET  /metrics/prometheus  aşama histogramları (Prometheus metin biçimi)
+    GET  /health
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+
+from artifact_store import ArtifactError, ensure_artifacts, store_from_source
+from inference_metrics import DEFAULT_PROFILE_DIR, DEFAULT_SAMPLE_INTERVAL_MS, SlowRequestProfiler, StageMetrics, StageRecorder, timed_predict
+from micro_batcher import DEFAULT_MAX_WAIT_MS, MicroBatcher
+from model_resources import (ALL_DESCRIPTIONS_PATH, MODEL_PATH, MODEL_TIER_ENV, MODEL_TIERS, STUDENT_MODEL_PATH, artifact_dir,
+                             load_artifacts, load_encoder, student_is_current, tier_joblibs)
+from prediction_cache import DEFAULT_MAX_SIZE, PredictionCache
+from tree_engine import compile_stacking
+
+# Tek bir satır için beklenen ham giriş alanları
+NUMERICAL_INPUTS = ['current', 'voltage', 'temp', 'pressure', 'humidity', 'speed', 'deg']
+
+# Gecikme yüzdelikleri için tutulan son istek sayısı
+LATENCY_WINDOW = 10_000
+
+
+class LatencyTracker:
+    """Son isteklerin gecikmelerini sınırlı bir pencerede tutar ve p50/p99 ile verim hesaplar."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self._started = time.monotonic()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+
+    def record(self, seconds, rows=1):
+        with self._lock:
+            self._samples.append((time.monotonic(), seconds))
+            self.requests += 1
+            self.rows += rows
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            samples = list(self._samples)
+            requests, rows, errors = self.requests, self.rows, self.errors
+        uptime = time.monotonic() - self._started
+        stats = {
+            'requests': requests,
+            'rows': rows,
+            'errors': errors,
+            'uptime_seconds': uptime,
+            'p50_ms': None,
+            'p99_ms': None,
+            'requests_per_second': 0.0,
+        }
+        if samples:
+            timestamps, latencies = zip(*samples)
+            p50, p99 = np.percentile(latencies, [50, 99])
+            span = max(timestamps[-1] - timestamps[0], 1e-9)
+            stats['p50_ms'] = p50 * 1000
+            stats['p99_ms'] = p99 * 1000
+            stats['requests_per_second'] = len(samples) / span if len(samples) > 1 else 0.0
+        return stats
+
+
+# --- Çalışan süreçler ---
+# Her çalışan süreç modeli bir kez yükler ve süreç ömrü boyunca bellekte tutar.
+_worker_artifacts = None
+
+
+def _init_worker(base_dir, model_path, compiled=False):
+    global _worker_artifacts
+    # fork ile ön yüklenmiş modeli devralan çalışanlar tekrar yüklemez
+    if _worker_artifacts is None:
+        _worker_artifacts = load_artifacts(base_dir, model_path=model_path)
+        if compiled and hasattr(_worker_artifacts.model, 'final_estimator_'):
+            # Ağaç toplulukları düz dizilere derlenir (küçük partilerde çok daha düşük gecikme); yalnızca stacking katmanı
+            _worker_artifacts = _worker_artifacts._replace(model=compile_stacking(_worker_artifacts.model))
+
+
+def _predict_matrix(matrix):
+    """Tahminleri ve aşama sürelerini (reindex, taban modeller, meta-model) birlikte döner."""
+    artifacts = _worker_artifacts
+    recorder = StageRecorder()
+    with recorder.timer('reindex'):
+        frame = artifacts.encoder.to_frame(matrix)
+    return timed_predict(artifacts.model, frame, recorder.timer), recorder.records
+
+
+def parse_rows(rows):
+    """JSON satırlarını doğrular; sayısal değer matrisini ve açıklama listesini döner."""
+    if not isinstance(rows, list) or not rows:
+        raise ValueError("'rows' boş olmayan bir liste olmalıdır.")
+    numerical_values = np.empty((len(rows), len(NUMERICAL_INPUTS)), dtype=np.float64)
+    descriptions = []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f"{i}. satır bir JSON nesnesi olmalıdır.")
+        missing = [name for name in NUMERICAL_INPUTS + ['description'] if name not in row]
+        if missing:
+            raise ValueError(f"{i}. satırda eksik alanlar var: {', '.join(missing)}")
+        try:
+            numerical_values[i] = [float(row[name]) for name in NUMERICAL_INPUTS]
+        except (TypeError, ValueError):
+            raise ValueError(f"{i}. satırdaki sayısal alanlar geçersiz.")
+        # NaN/inf içeren satır burada reddedilir: micro-batching'de diğer isteklerle aynı partiye girip
+        # onların tahminlerini de bozmasın (önbellek de bu satırları nicemleyemez)
+        if not np.isfinite(numerical_values[i]).all():
+            raise ValueError(f"{i}. satırdaki sayısal alanlar sonlu (NaN/inf olmayan) değerler olmalıdır.")
+        descriptions.append(str(row['description']))
+    return numerical_values, descriptions
+
+
+class PredictionService:
+    """Modeli sıcak tutar ve tahminleri çalışan süreç havuzuna (veya aynı sürece) dağıtır."""
+
+    def __init__(self, base_dir='.', model_path=MODEL_PATH, workers=0, max_batch_size=0,
+                 batch_window_ms=DEFAULT_MAX_WAIT_MS, preload=False, compiled=False, cache_size=0,
+                 cache_ttl=None, cache_precision=None, profiler=None):
+        if profiler is not None and workers > 0:
+            # Model işi çalışan süreçlerde yapılır; profilleyici yalnızca Future beklemesini görürdü
+            raise ValueError("Yavaş istek profilleyicisi çalışan süreçlerle (workers > 0) kullanılamaz.")
+        self.workers = workers
+        self.descriptions = joblib.load(os.path.join(base_dir, ALL_DESCRIPTIONS_PATH))
+        # Girişler bu süreçte kodlanır; çalışanlara yalnızca hazır özellik matrisi gönderilir
+        self.encoder = load_encoder(base_dir)
+        self.metrics = LatencyTracker()
+        self.stage_metrics = StageMetrics()
+        # İsteğe bağlı: yavaş istekler için katlanmış yığın (flame graph) örnekleri
+        self.profiler = profiler
+        if workers > 0:
+            mp_context = None
+            if preload:
+                # Model ana süreçte bir kez yüklenir, çalışanlar fork ile başlatılır: ağaç dizileri
+                # yazma-anında-kopyalama ile paylaşılır ve her çalışan kendi kopyasını tutmaz.
+                # Fork, ana süreç henüz hiç tahmin yapmadan (OpenMP iş parçacıkları başlamadan) yapılır.
+                _init_worker(base_dir, model_path, compiled)
+                mp_context = multiprocessing.get_context('fork')
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                 initargs=(base_dir, model_path, compiled), mp_context=mp_context)
+            # Tüm çalışanların modeli yüklemesini bekle (ilk istek soğuk başlamasın)
+            list(self._executor.map(_warmup, range(workers)))
+        else:
+            _init_worker(base_dir, model_path, compiled)
+            self._executor = None
+
+        self.cache = None
+        if cache_size > 0:
+            self.cache = PredictionCache(self._predict_encoded, self.encoder, precision=cache_precision,
+                                         max_size=cache_size, ttl=cache_ttl)
+
+        # max_batch_size > 1 ise eşzamanlı tek satırlık istekler tek bir predict çağrısında birleştirilir
+        self._batcher = None
+        if max_batch_size > 1:
+            # Çalışan süreçler varsa dağıtıcı sonucu beklemez: her çalışan için bir parti aynı anda işlemde olabilir
+            if self._executor is not None:
+                self._batcher = MicroBatcher(self._submit_arrays, max_batch_size=max_batch_size,
+                                             max_wait_ms=batch_window_ms, max_in_flight=workers)
+            else:
+                self._batcher = MicroBatcher(self._predict_arrays, max_batch_size=max_batch_size,
+                                             max_wait_ms=batch_window_ms)
+
+    def _submit_encoded(self, matrix):
+        """Matrisi bir çalışan sürece gönderir; tahmin dizisini taşıyan bir Future döner."""
+        result = Future()
+
+        def done(future):
+            try:
+                # Çalışan süreçte ölçülen aşama süreleri tahminlerle birlikte geri gelir
+                predictions, records = future.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            self.stage_metrics.observe_many(records)
+            result.set_result(predictions)
+
+        self._executor.submit(_predict_matrix, matrix).add_done_callback(done)
+        return result
+
+    def _predict_encoded(self, matrix):
+        if self._executor is not None:
+            return self._submit_encoded(matrix).result()
+        predictions, records = _predict_matrix(matrix)
+        self.stage_metrics.observe_many(records)
+        return predictions
+
+    def _predict_arrays(self, numerical_values, descriptions):
+        matrix = self.encoder.encode_arrays(numerical_values, descriptions, timer=self.stage_metrics.timer)
+        if self.cache is not None:
+            return self.cache.predict_matrix(matrix).tolist()
+        return np.asarray(self._predict_encoded(matrix)).tolist()
+
+    def _submit_arrays(self, numerical_values, descriptions):
+        """_predict_arrays'in beklemeyen karşılığı (MicroBatcher, çalışan süreçlerle)."""
+        matrix = self.encoder.encode_arrays(numerical_values, descriptions, timer=self.stage_metrics.timer)
+        if self.cache is not None:
+            return self.cache.submit_matrix(matrix, self._submit_encoded)
+        return self._submit_encoded(matrix)
+
+    def predict(self, rows, label='predict'):
+        if self.profiler is not None:
+            # Tek satırlık istekler micro-batching ile dağıtıcı iş parçacığında kodlanıp tahmin edilir; o da örneklenir
+            batched = self._batcher is not None and isinstance(rows, list) and len(rows) == 1
+            extra_threads = [self._batcher.thread_id] if batched else []
+            with self.profiler.profile(label, extra_threads):
+                return self._predict_rows(rows)
+        return self._predict_rows(rows)
+
+    def _predict_rows(self, rows):
+        numerical_values, descriptions = parse_rows(rows)
+        if self._batcher is not None and len(descriptions) == 1:
+            return [self._batcher.predict(numerical_values[0], descriptions[0])]
+        return self._predict_arrays(numerical_values, descriptions)
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.close()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+def _warmup(_):
+    return _worker_artifacts is not None
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive: yoklama yapan istemciler bağlantıyı yeniden kullanabilir
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        self._send_body(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def _send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'workers': service.workers})
+        elif self.path == '/metrics':
+            stats = service.metrics.snapshot()
+            if service.cache is not None:
+                stats['cache'] = service.cache.stats()
+            stats['stages'] = service.stage_metrics.summary()
+            if service.profiler is not None:
+                stats['profiles'] = [{'label': label, 'ms': ms, 'path': path} for label, ms, path in service.profiler.recent]
+            self._send_json(200, stats)
+        elif self.path == '/metrics/prometheus':
+            body = service.stage_metrics.export_prometheus().encode('utf-8')
+            self._send_body(200, body, 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send_json(404, {'error': 'Bulunamadı'})
+
+    def do_POST(self):
+        service = self.server.service
+        start = time.perf_counter()
+        try:
+            payload = self._read_json()
+            if self.path == '/predict':
+                predictions = service.predict([payload], label=self.path)
+                response = {'active_power': predictions[0]}
+            elif self.path == '/predict/batch':
+                rows = payload.get('rows') if isinstance(payload, dict) else payload
+                predictions = service.predict(rows, label=self.path)
+                response = {'predictions': predictions}
+            else:
+                self._send_json(404, {'error': 'Bulunamadı'})
+                return
+        except ValueError as e: # json.JSONDecodeError da ValueError'dır
+            service.metrics.record_error()
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            service.metrics.record_error()
+            self._send_json(500, {'error': str(e)})
+            return
+        elapsed = time.perf_counter() - start
+        service.metrics.record(elapsed, rows=len(predictions))
+        service.stage_metrics.observe('request', elapsed)
+        self._send_json(200, response)
+
+
+def create_server(service, host='127.0.0.1', port=8600):
+    """Servisi sunan (henüz başlatılmamış) HTTP sunucusunu oluşturur; port=0 boş bir port seçer."""
+    server = ThreadingHTTPServer((host, port), PredictionRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+class PredictionClient:
+    """Servis için basit, keep-alive kullanan JSON istemcisi."""
+
+    def __init__(self, host='127.0.0.1', port=8600, timeout=30):
+        self._connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        headers = {} if body is None else {'Content-Type': 'application/json'}
+        self._connection.request(method, path, body=body, headers=headers)
+        response = self._connection.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {data.get('error')}")
+        return data
+
+    def predict(self, row):
+        return self._request('POST', '/predict', row)['active_power']
+
+    def predict_batch(self, rows):
+        return self._request('POST', '/predict/batch', {'rows': rows})['predictions']
+
+    def metrics(self):
+        return self._request('GET', '/metrics')
+
+    def prometheus_metrics(self):
+        self._connection.request('GET', '/metrics/prometheus')
+        response = self._connection.getresponse()
+        return response.read().decode('utf-8')
+
+    def close(self):
+        self._connection.close()
+
+
+def run_local_benchmark(service, n_requests=1000, concurrency=8, batch_size=1):
+    """Servisi 127.0.0.1 üzerinde başlatır ve yerel istemcilerle yük altında ölçer (ağ erişimi gerekmez)."""
+    server = create_server(service, port=0)
+    host, port = server.server_address[:2]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    descriptions = list(service.descriptions)
+
+    def make_row(rng):
+        return {
+            'current': float(rng.uniform(0.5, 8.0)), 'voltage': float(rng.uniform(110, 135)),
+            'temp': float(rng.uniform(-5, 40)), 'pressure': float(rng.uniform(995, 1035)),
+            'humidity': float(rng.uniform(10, 100)), 'speed': float(rng.uniform(0, 12)),
+            'deg': float(rng.uniform(0, 360)), 'description': descriptions[rng.integers(len(descriptions))],
+        }
+
+    per_client = max(1, n_requests // concurrency)
+
+    def client_loop(seed):
+        rng = np.random.default_rng(seed)
+        client = PredictionClient(host, port)
+        try:
+            for _ in range(per_client):
+                if batch_size == 1:
+                    client.predict(make_row(rng))
+                else:
+                    client.predict_batch([make_row(rng) for _ in range(batch_size)])
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client_loop, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stats = service.metrics.snapshot()
+    if service.cache is not None:
+        stats['cache'] = service.cache.stats()
+    stats['stages'] = service.stage_metrics.summary()
+    stats['wall_seconds'] = elapsed
+    stats['client_requests_per_second'] = per_client * concurrency / elapsed
+    stats['client_rows_per_second'] = per_client * concurrency * batch_size / elapsed
+    server.shutdown()
+    server.server_close()
+    return stats
+
+
+def parse_precision(text):
+    """'voltage=0.5,temp=0.2' biçimindeki metni {özellik: adım} sözlüğüne çevirir."""
+    if not text:
+        return None
+    precision = {}
+    for item in text.split(','):
+        name, _, value = item.partition('=')
+        precision[name.strip()] = float(value)
+    return precision
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enerji tüketimi HTTP/JSON tahmin servisi")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--workers', type=int, default=0, help="Tahmin süreç sayısı (0: aynı süreçte tahmin)")
+    parser.add_argument('--base-dir', default='.', help="Model ve joblib dosyalarının bulunduğu dizin")
+    parser.add_argument('--model-path', default=MODEL_PATH)
+    parser.add_argument('--model-tier', choices=list(MODEL_TIERS), default=os.environ.get(MODEL_TIER_ENV),
+                        help=f"Model katmanı: stacking (tam model), student (damıtılmış), linear (varsayılan: ${MODEL_TIER_ENV})")
+    parser.add_argument('--artifact-source', default=None,
+                        help="Eksik/bozuk artifact'ların alınacağı yerel dizin veya http(s) adresi (varsayılan: manifest)")
+    parser.add_argument('--preload', action='store_true',
+                        help="Modeli ana süreçte yükleyip çalışanları fork ile başlat (bellek paylaşımı)")
+    parser.add_argument('--compiled', action='store_true',
+                        help="Stacking modelini tree_engine ile derlenmiş düz dizi motoruyla çalıştır")
+    parser.add_argument('--max-batch-size', type=int, default=0,
+                        help="Tek satırlık istekleri birleştiren micro-batching için en büyük parti (0: kapalı)")
+    parser.add_argument('--batch-window-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Micro-batching için isteklerin toplandığı en uzun süre (ms)")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help=f"Nicemlenmiş girişlere göre tahmin önbelleği boyutu (0: kapalı, ör. {DEFAULT_MAX_SIZE})")
+    parser.add_argument('--cache-ttl', type=float, default=None, help="Önbellek girdilerinin geçerlilik süresi (sn)")
+    parser.add_argument('--cache-precision', default=None,
+                        help="Özellik başına nicemleme adımı, ör. 'voltage=0.5,temp=0.2' (ham birimlerde)")
+    parser.add_argument('--profile-slow-ms', type=float, default=None,
+                        help="Bu süreden uzun istekler için katlanmış yığın (flame graph) örnekleri yaz (varsayılan: kapalı; yalnızca --workers 0)")
+    parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR, help="Profil (.folded) dosyalarının yazılacağı dizin")
+    parser.add_argument('--profile-interval-ms', type=float, default=DEFAULT_SAMPLE_INTERVAL_MS,
+                        help="Profilleyicinin yığın örnekleme aralığı (ms)")
+    parser.add_argument('--benchmark', action='store_true', help="Yerel istemcilerle yük testi çalıştır ve çık")
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=1)
+    args = parser.parse_args()
+
+    base_dir = args.base_dir
+    model_path = MODEL_TIERS[args.model_tier] if args.model_tier else args.model_path
+    tier = {path: tier for tier, path in MODEL_TIERS.items()}.get(model_path)
+    if tier is not None:
+        # incremental_update.py ile etkinleştirilmiş bir sürüm varsa servis o sürümle başlar
+        base_dir = artifact_dir(args.base_dir)
+        try:
+            ensure_artifacts(tier_joblibs(tier), base_dir, store=store_from_source(args.artifact_source))
+        except ArtifactError as e:
+            parser.error(str(e))
+    if model_path == STUDENT_MODEL_PATH and not student_is_current(base_dir):
+        parser.error(f"'{os.path.join(base_dir, STUDENT_MODEL_PATH)}' güncel stacking modelinden damıtılmamış "
+                     f"(yeniden eğitim veya incremental_update sonrası); önce model_distillation.py çalıştırın.")
+    if args.profile_slow_ms is not None and args.workers > 0:
+        parser.error("--profile-slow-ms yalnızca --workers 0 ile kullanılabilir (çalışan süreçlerdeki model işi örneklenemez).")
+    profiler = None
+    if args.profile_slow_ms is not None:
+        profiler = SlowRequestProfiler(args.profile_slow_ms, args.profile_dir, interval_ms=args.profile_interval_ms)
+    service = PredictionService(base_dir, model_path=model_path, workers=args.workers,
+                                max_batch_size=args.max_batch_size, batch_window_ms=args.batch_window_ms,
+                                preload=args.preload, compiled=args.compiled, cache_size=args.cache_size,
+                                cache_ttl=args.cache_ttl, cache_precision=parse_precision(args.cache_precision),
+                                profiler=profiler)
+    try:
+        if args.benchmark:
+            stats = run_local_benchmark(service, args.requests, args.concurrency, args.batch_size)
+            print(json.dumps(stats, indent=2))
+            return
+        server = create_server(service, args.host, args.port)
+        print(f"Tahmin servisi http://{args.host}:{server.server_address[1]} adresinde çalışıyor "
+              f"({args.workers} çalışan, model: {model_path})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
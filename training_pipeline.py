@@ -0,0 +1,257 @@
+"""energy_prediction_model.ipynb'deki eğitim adımlarının komut satırından çalıştırılabilen, paralel sürümü.
+
+Notebook ile aynı ön işleme (sütun seçimi, one-hot kodlama, sütun adı temizliği, StandardScaler),
+aynı parametre ızgaraları ve aynı Stacking mimarisi (RandomForest + LightGBM + XGBoost, Ridge
+meta-model) kullanılır; ancak gereksiz yeniden eğitimler yapılmaz:
+
+* Parametre araması hyperparameter_search.py ile yapılır: tüm model aileleri ortak bir KFold ve ortak
+  bir süreç havuzunda eşzamanlı aranır, LightGBM/XGBoost'un n_estimators değerleri tek eğitimle
+  değerlendirilir, varsayılan olarak ardışık yarılama (--search halving) kullanılır ve kat sonuçları
+  tuning_cache/ altında saklanır (yarıda kalan arama kaldığı yerden devam eder).
+* Seçilen parametrelerin kat dışı (out-of-fold) tahminleri doğrudan Ridge meta-modelinin eğitim
+  verisi olur; StackingRegressor'ın temel modelleri cv=5 ile baştan eğitmesine gerek kalmaz.
+* En iyi modeller tüm eğitim verisiyle yalnızca bir kez eğitilir; hem tekil değerlendirme hem de
+  stacking modeli bu eğitilmiş modelleri kullanır. VotingRegressor sonucu da aynı tahminlerin
+  ortalamasıdır, ayrıca eğitilmez.
+
+CPU bütçesi (--n-jobs) dış paralellik (eşzamanlı eğitimler) ile modellerin kendi iş
+parçacıkları (RandomForest/LightGBM/XGBoost n_jobs) arasında bölünür; toplam çekirdek sayısı aşılmaz.
+
+Kullanım:
+    python training_pipeline.py --data energy_weather_raw_data.csv --output-dir . --n-jobs 8
+    python training_pipeline.py --dataset energy_dataset --output-dir . --n-jobs 8   # bkz. data_ingestion.py
+    python training_pipeline.py --data energy_weather_raw_data.csv --search grid     # notebook ile aynı kapsamlı arama
+"""
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor, StackingRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.utils import Bunch
+
+from artifact_store import write_manifest
+from hyperparameter_search import (DEFAULT_CACHE_DIR, DEFAULT_HALVING_FACTOR, SEARCH_METHODS, search_with_oof,
+                                   set_threads, split_cpu_budget)
+from model_resources import (ALL_DESCRIPTIONS_PATH, LR_PATH, MODEL_PATH, NUMERICAL_FEATURES_PATH,
+                             ORIGINAL_X_COLUMNS_PATH, MANIFEST_JOBLIBS, SCALER_PATH)
+
+RAW_DATA_PATH = "energy_weather_raw_data.csv"
+
+TARGET = 'active_power'
+NUMERICAL_FEATURES = ['current', 'voltage', 'temp', 'pressure', 'humidity', 'speed', 'deg']
+COLUMNS_TO_KEEP = [TARGET] + NUMERICAL_FEATURES + ['description']
+
+# Notebook'taki param_grids ile aynı
+PARAM_GRIDS = {
+    'Ridge Regression': {'alpha': [0.1, 1.0, 10.0]},
+    'Lasso Regression': {'alpha': [0.01, 0.1, 1.0]},
+    'Random Forest': {'n_estimators': [100], 'max_depth': [15, 20]},
+    'LightGBM': {'n_estimators': [100, 200], 'learning_rate': [0.05, 0.1]},
+    'XGBoost': {'n_estimators': [100, 200], 'learning_rate': [0.05, 0.1], 'max_depth': [5, 7]},
+}
+
+# Stacking modelinin temel modelleri (notebook'taki sırayla)
+STACKING_MODELS = ['Random Forest', 'LightGBM', 'XGBoost']
+
+
+def make_models(random_state=42):
+    """Notebook'taki models_to_tune sözlüğünün karşılığı."""
+    import lightgbm as lgb
+    import xgboost as xg_boost
+    return {
+        'Ridge Regression': Ridge(),
+        'Lasso Regression': Lasso(),
+        'Random Forest': RandomForestRegressor(random_state=random_state),
+        'LightGBM': lgb.LGBMRegressor(random_state=random_state),
+        'XGBoost': xg_boost.XGBRegressor(random_state=random_state),
+    }
+
+
+# --- Ön işleme ---
+
+def preprocess(df):
+    """Notebook ile aynı ön işleme; X, y ve kaydedilecek yardımcı nesneleri döner."""
+    df = df[COLUMNS_TO_KEEP]
+    df_encoded = pd.get_dummies(df, columns=['description'], dtype='int')
+    df_encoded.columns = df_encoded.columns.str.replace(r'[^A-Za-z0-9_]+', '_', regex=True)
+
+    X = df_encoded.drop(TARGET, axis=1)
+    y = df_encoded[TARGET]
+
+    scaler = StandardScaler()
+    X[NUMERICAL_FEATURES] = scaler.fit_transform(X[NUMERICAL_FEATURES])
+
+    original_X_columns = X.columns
+    all_descriptions = df['description'].unique().tolist()
+    return X, y, scaler, original_X_columns, all_descriptions
+
+
+def preprocess_dataset(dataset_dir, batch_size=None, max_rows=None, random_state=42):
+    """data_ingestion.py ile oluşturulan veri kümesinden preprocess() ile aynı çıktıyı üretir.
+
+    Veri parça parça okunup doğrudan float32 özellik matrisine kodlanır; scaler, veri kümesine eklenirken
+    birikimli hesaplanan scaler'dır. Matris tüm satırları (veya max_rows'luk rastgele alt örneği) bellekte tutar.
+    """
+    import data_ingestion
+
+    encoder = data_ingestion.dataset_encoder(dataset_dir)
+    X_values, y_values = data_ingestion.load_encoded(dataset_dir, encoder,
+                                                     batch_size=batch_size or data_ingestion.DEFAULT_CHUNK_SIZE,
+                                                     max_rows=max_rows, random_state=random_state)
+    X = encoder.to_frame(X_values)
+    y = pd.Series(y_values, name=TARGET)
+    all_descriptions = data_ingestion.load_meta(dataset_dir)['descriptions']
+    return X, y, data_ingestion.load_scaler(dataset_dir), pd.Index(encoder.columns), all_descriptions
+
+
+# --- Ayarlama sonrası yeniden eğitim ---
+
+def _refit(model, params, X, y, n_threads):
+    return set_threads(clone(model).set_params(**params), n_threads).fit(X, y)
+
+
+def refit_best(models, tuning, X, y, n_jobs=-1):
+    """En iyi parametrelerle her modeli tüm eğitim verisinde bir kez eğitir."""
+    outer, inner = split_cpu_budget(n_jobs, len(models))
+    fitted = Parallel(n_jobs=outer)(
+        delayed(_refit)(model, tuning[name]['params'], X, y, inner) for name, model in models.items()
+    )
+    return dict(zip(models, fitted))
+
+
+def build_stacking(best_estimators, oof_predictions, y, names=STACKING_MODELS, alpha=1.0):
+    """Eğitilmiş temel modellerden ve kat dışı tahminlerinden StackingRegressor oluşturur (yeniden eğitmeden).
+
+    Sonuç, notebook'taki StackingRegressor(estimators, final_estimator=Ridge(alpha=1.0)) ile aynı arayüze
+    sahiptir ve aynı şekilde joblib ile kaydedilip uygulamada kullanılabilir.
+    """
+    estimators = [(name, best_estimators[name]) for name in names]
+    meta_features = np.column_stack([oof_predictions[name] for name in names])
+
+    stacking_regressor = StackingRegressor(
+        estimators=[(name, clone(model)) for name, model in estimators],
+        final_estimator=Ridge(alpha=alpha),
+    )
+    stacking_regressor.estimators_ = [model for _, model in estimators]
+    stacking_regressor.named_estimators_ = Bunch(**dict(estimators))
+    stacking_regressor.stack_method_ = ['predict'] * len(estimators)
+    stacking_regressor.final_estimator_ = Ridge(alpha=alpha).fit(meta_features, np.asarray(y, dtype=np.float64))
+    if hasattr(estimators[0][1], 'feature_names_in_'):
+        stacking_regressor.feature_names_in_ = estimators[0][1].feature_names_in_
+    return stacking_regressor
+
+
+# --- Değerlendirme ve kayıt ---
+
+def evaluate(name, y_true, y_pred, model_performance):
+    mae = mean_absolute_error(y_true, y_pred)
+    mse = mean_squared_error(y_true, y_pred)
+    r2 = r2_score(y_true, y_pred)
+    print(f"Model: {name}")
+    print(f"Mean Absolute Error: {mae:.2f}")
+    print(f"Mean Squared Error: {mse:.2f}")
+    print(f"R² Score: {r2}")
+    print("-" * 50)
+    model_performance[name] = {'MAE': mae, 'MSE': mse, 'R²': r2}
+
+
+def dump_artifact(obj, path, **kwargs):
+    # Önce geçici dosyaya yaz, sonra taşı: yarım kalan kayıt geçerli bir artifact gibi görünmesin
+    joblib.dump(obj, path + '.part', **kwargs)
+    os.replace(path + '.part', path)
+
+
+def save_artifacts(output_dir, stacking_regressor, lr, scaler, original_X_columns, all_descriptions,
+                   numerical_features=NUMERICAL_FEATURES):
+    os.makedirs(output_dir, exist_ok=True)
+    dump_artifact(stacking_regressor, os.path.join(output_dir, MODEL_PATH))
+    dump_artifact(lr, os.path.join(output_dir, LR_PATH), compress='zlib')
+    dump_artifact(scaler, os.path.join(output_dir, SCALER_PATH))
+    dump_artifact(original_X_columns, os.path.join(output_dir, ORIGINAL_X_COLUMNS_PATH))
+    dump_artifact(all_descriptions, os.path.join(output_dir, ALL_DESCRIPTIONS_PATH))
+    dump_artifact(list(numerical_features), os.path.join(output_dir, NUMERICAL_FEATURES_PATH))
+    # Uygulamanın artifact deposu yeni dosyaları bu checksum'larla doğrular
+    write_manifest(MANIFEST_JOBLIBS, output_dir)
+
+
+def run_pipeline(prepared, output_dir='.', cv=3, n_jobs=-1, test_size=0.2, random_state=42, search='halving',
+                 halving_factor=DEFAULT_HALVING_FACTOR, tuning_cache_dir=DEFAULT_CACHE_DIR):
+    """prepared: preprocess() veya preprocess_dataset() çıktısı."""
+    start = time.perf_counter()
+    X, y, scaler, original_X_columns, all_descriptions = prepared
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    model_performance = {}
+
+    lr = LinearRegression().fit(X_train, y_train)
+    evaluate('Linear Regression', y_test, lr.predict(X_test), model_performance)
+
+    models = make_models(random_state)
+    tuning = search_with_oof(models, PARAM_GRIDS, X_train, y_train, cv=cv, n_jobs=n_jobs, method=search,
+                             factor=halving_factor, cache_dir=tuning_cache_dir, random_state=random_state)
+    best_estimators = refit_best(models, tuning, X_train, y_train, n_jobs=n_jobs)
+
+    test_predictions = {}
+    for name, model in best_estimators.items():
+        test_predictions[name] = model.predict(X_test)
+        evaluate(f'{name} (Optimize Edilmiş)', y_test, test_predictions[name], model_performance)
+
+    # VotingRegressor, temel modellerin tahminlerinin ortalamasıdır
+    voting_prediction = np.mean([test_predictions[name] for name in STACKING_MODELS], axis=0)
+    evaluate('Ensemble Learning', y_test, voting_prediction, model_performance)
+
+    stacking_regressor = build_stacking(best_estimators, {name: tuning[name]['oof'] for name in STACKING_MODELS},
+                                        y_train)
+    evaluate('Ensemble (Stacking)', y_test, stacking_regressor.predict(X_test), model_performance)
+
+    performance_df = pd.DataFrame(model_performance).T
+    print("\n--- Tüm Modellerin Performans Karşılaştırması ---")
+    print(performance_df.sort_values(by='R²', ascending=False))
+
+    save_artifacts(output_dir, stacking_regressor, lr, scaler, original_X_columns, all_descriptions)
+    print(f"\nArtifact'lar '{output_dir}' dizinine kaydedildi ({time.perf_counter() - start:.1f} sn).")
+    return stacking_regressor, performance_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enerji tüketimi modelini eğit ve artifact'ları kaydet")
+    parser.add_argument('--data', default=RAW_DATA_PATH)
+    parser.add_argument('--dataset', default=None,
+                        help="CSV yerine data_ingestion.py ile oluşturulan veri kümesi dizinini kullan "
+                             "(özellik matrisi bellekte kurulur; bellek satır sayısıyla büyür)")
+    parser.add_argument('--max-rows', type=int, default=None,
+                        help="--dataset ile en fazla bu kadar satırlık rastgele alt örnekle eğit (bellek sınırı)")
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--cv', type=int, default=3,
+                        help="Ayarlama ve stacking meta-modeli için ortak kat sayısı")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Toplam CPU bütçesi (-1: tüm çekirdekler)")
+    parser.add_argument('--search', choices=SEARCH_METHODS, default='halving',
+                        help="Parametre arama yöntemi (grid: notebook'taki GridSearchCV ile aynı kapsamlı arama)")
+    parser.add_argument('--halving-factor', type=int, default=DEFAULT_HALVING_FACTOR,
+                        help="Ardışık yarılamada her turda kalan aday oranı (1/factor)")
+    parser.add_argument('--tuning-cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="Kat sonuçlarının saklandığı dizin (aynı veri ve parametrelerle tekrar eğitilmez)")
+    parser.add_argument('--no-tuning-cache', action='store_true', help="Kat sonuçlarını diske yazma/okuma")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--random-state', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.dataset:
+        prepared = preprocess_dataset(args.dataset, max_rows=args.max_rows, random_state=args.random_state)
+    else:
+        prepared = preprocess(pd.read_csv(args.data))
+    run_pipeline(prepared, args.output_dir, cv=args.cv, n_jobs=args.n_jobs, test_size=args.test_size,
+                 random_state=args.random_state, search=args.search, halving_factor=args.halving_factor,
+                 tuning_cache_dir=None if args.no_tuning_cache else args.tuning_cache_dir)
+
+
+if __name__ == '__main__':
+    main()
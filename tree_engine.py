@@ -0,0 +1,359 @@
+"""Stacking modelindeki ağaç topluluklarını tek bir düz dizi temsiline derleyen çıkarım motoru.
+
+RandomForest (sklearn), LightGBM ve XGBoost temel modellerinin tüm ağaçları aynı biçime dönüştürülür:
+düğüm başına özellik indeksi, eşik, sol/sağ çocuk ve yaprak değeri dizileri. Bir parti (batch) için tüm
+ağaçlar NumPy ile vektörel olarak dolaşılır, ardından Ridge meta-modelinin katsayıları doğrudan uygulanır.
+
+Her kütüphanenin karşılaştırma kuralı birebir korunur:
+    sklearn:  float32(x) <= eşik (float64)
+    LightGBM: x (float64) <= eşik (float64)
+    XGBoost:  float32(x) <  eşik (float32)   -> float32(x) <= bir önceki float32 değeri
+Yaprak değerleri de kütüphanenin sırası ve hassasiyetiyle toplanır: XGBoost taban skordan başlayarak
+ağaç sırasıyla float32'de, diğerleri float64'te; fark yalnızca float64 toplama sırasından gelir (~1e-15).
+
+Eksik değer (NaN) yönlendirmesi (LightGBM missing_type/default_left, XGBoost default_left) derlenmez;
+NaN veya inf içeren girdi, sessizce yanlış dala gitmesin diye ValueError ile reddedilir.
+
+Karşılaştırmalı ölçüm:
+    python tree_engine.py --benchmark
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+# Vektörel dolaşmada aynı anda işlenen (satır x ağaç) düğüm sayısının üst sınırı
+_MAX_ACTIVE_NODES = 1 << 18
+
+
+class TreeGroup:
+    """Tek bir temel modelin tüm ağaçlarının düz dizi temsili.
+
+    Her iç düğümün çocukları yan yana saklanır (sol = child[i], sağ = child[i] + 1), böylece bir adım
+    yalnızca özellik, eşik ve çocuk dizilerinden okuma yapar. Yaprak düğümler kendilerine döner
+    (child = kendisi, eşik = +inf); yaprağa ulaşan (satır, ağaç) çiftleri etkin kümeden çıkarılır.
+    """
+
+    def __init__(self, feature, threshold, child, value, roots, depth, input_dtype, scale=1.0, bias=0.0,
+                 sum_dtype=np.float64):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.child = np.asarray(child, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.depth = int(depth)
+        self.input_dtype = np.dtype(input_dtype)
+        self.scale = scale
+        self.bias = bias
+        self.sum_dtype = np.dtype(sum_dtype)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def predict(self, X):
+        X = np.ascontiguousarray(X, dtype=self.input_dtype)
+        if not np.isfinite(X).all():
+            raise ValueError("Derlenmiş motor NaN/inf içeren girdileri desteklemez.")
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        out = np.empty(n_rows, dtype=np.float64)
+        chunk = max(1, _MAX_ACTIVE_NODES // max(self.n_trees, 1))
+        for start in range(0, n_rows, chunk):
+            stop = min(start + chunk, n_rows)
+            # Her (satır, ağaç) çifti için X'in düz dizideki satır başlangıcı
+            x_offset = np.repeat(np.arange(start, stop, dtype=np.int64) * n_features, self.n_trees)
+            node = np.tile(self.roots, stop - start)
+            active = np.arange(len(node))
+            for _ in range(self.depth):
+                current = node[active]
+                go_right = flat_X[x_offset[active] + self.feature[current]] > self.threshold[current]
+                current = self.child[current] + go_right
+                node[active] = current
+                # Yaprağa ulaşan çiftler (child = kendisi) sonraki adımlarda işlenmez
+                still_internal = self.child[current] != current
+                if not still_internal.all():
+                    active = active[still_internal]
+                    if len(active) == 0:
+                        break
+            out[start:stop] = self._sum_leaves(self.value[node].reshape(stop - start, self.n_trees))
+        return out
+
+    def _sum_leaves(self, leaf_values):
+        if self.sum_dtype == np.float64:
+            return leaf_values.sum(axis=1) * self.scale + self.bias
+        # cumsum sıralı toplar: taban skor + ağaç 1 + ağaç 2 ... (kütüphanenin tahmin döngüsündeki sırayla)
+        terms = np.empty((len(leaf_values), self.n_trees + 1), dtype=self.sum_dtype)
+        terms[:, 0] = self.bias
+        terms[:, 1:] = leaf_values
+        return np.cumsum(terms, axis=1, dtype=self.sum_dtype)[:, -1].astype(np.float64) * self.scale
+
+
+class _GroupBuilder:
+    def __init__(self):
+        self.feature, self.threshold, self.child, self.value = [], [], [], []
+        self.roots = []
+        self.n_nodes = 0
+        self.depth = 0
+
+    def add_tree(self, feature, threshold, left, right, value, depth):
+        """left/right ağaç içi indekslerdir (yapraklar için -1); düğümler kardeşler yan yana gelecek şekilde yeniden sıralanır."""
+        left = np.asarray(left)
+        right = np.asarray(right)
+        n = len(left)
+        new_index = np.empty(n, dtype=np.int64)
+        order = [0]
+        new_index[0] = 0
+        # Genişlik öncelikli yerleşim: her iç düğümün iki çocuğu ardışık iki konuma yazılır
+        for i in order:
+            if left[i] >= 0:
+                new_index[left[i]] = len(order)
+                new_index[right[i]] = len(order) + 1
+                order.extend((left[i], right[i]))
+        order = np.asarray(order)
+        is_leaf = left[order] < 0
+        offset = self.n_nodes
+        positions = np.arange(n) + offset
+        child = np.where(is_leaf, positions, new_index[np.where(is_leaf, 0, left[order])] + offset)
+
+        self.feature.append(np.where(is_leaf, 0, np.asarray(feature)[order]))
+        self.threshold.append(np.where(is_leaf, np.inf, np.asarray(threshold, dtype=np.float64)[order]))
+        self.child.append(child)
+        self.value.append(np.where(is_leaf, np.asarray(value, dtype=np.float64)[order], 0.0))
+        self.roots.append(offset)
+        self.n_nodes += n
+        self.depth = max(self.depth, depth)
+
+    def build(self, input_dtype, scale=1.0, bias=0.0, sum_dtype=np.float64):
+        if not self.roots:
+            raise ValueError("Derlenecek ağaç bulunamadı.")
+        if self.n_nodes >= np.iinfo(np.int32).max:
+            raise ValueError("Topluluk 32 bit düğüm indeksine sığmıyor.")
+        return TreeGroup(np.concatenate(self.feature), np.concatenate(self.threshold), np.concatenate(self.child),
+                         np.concatenate(self.value), self.roots, self.depth, input_dtype, scale=scale, bias=bias,
+                         sum_dtype=sum_dtype)
+
+
+def _tree_depth(left, right):
+    depth = np.zeros(len(left), dtype=np.intp)
+    # Çocuk indeksleri ebeveynden büyük olmayabilir (XGBoost); bu yüzden yığınla dolaş
+    stack = [0]
+    while stack:
+        i = stack.pop()
+        if left[i] >= 0:
+            depth[left[i]] = depth[right[i]] = depth[i] + 1
+            stack.extend((left[i], right[i]))
+    return int(depth.max())
+
+
+def compile_sklearn_forest(forest):
+    """sklearn RandomForestRegressor / ExtraTreesRegressor / DecisionTreeRegressor derler."""
+    trees = getattr(forest, 'estimators_', [forest])
+    builder = _GroupBuilder()
+    for estimator in trees:
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise TypeError("Yalnızca tek çıktılı regresyon ağaçları desteklenir.")
+        builder.add_tree(tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                         tree.value[:, 0, 0], tree.max_depth)
+    # Orman tahmini ağaçların ortalamasıdır
+    return builder.build(np.float32, scale=1.0 / len(trees))
+
+
+def _flatten_lightgbm_tree(structure):
+    feature, threshold, left, right, value = [], [], [], [], []
+
+    def visit(node):
+        i = len(feature)
+        feature.append(0)
+        threshold.append(0.0)
+        left.append(-1)
+        right.append(-1)
+        value.append(0.0)
+        if 'leaf_value' in node:
+            value[i] = node['leaf_value']
+            return i
+        if node['decision_type'] != '<=':
+            raise TypeError("LightGBM kategorik bölünmeleri desteklenmez.")
+        feature[i] = node['split_feature']
+        threshold[i] = node['threshold']
+        left[i] = visit(node['left_child'])
+        right[i] = visit(node['right_child'])
+        return i
+
+    visit(structure)
+    return np.array(feature), np.array(threshold, dtype=np.float64), np.array(left), np.array(right), np.array(value)
+
+
+def compile_lightgbm(model):
+    """LGBMRegressor (veya lightgbm.Booster) derler; model.predict ile aynı iterasyon sayısını kullanır."""
+    booster = getattr(model, 'booster_', model)
+    dump = booster.dump_model()
+    if dump.get('num_tree_per_iteration', 1) != 1 or dump.get('average_output'):
+        raise TypeError("Yalnızca tek çıktılı gbdt LightGBM regresyon modelleri desteklenir.")
+    objective = dump.get('objective', '').split()[0]
+    if objective not in ('regression', 'regression_l1', 'huber', 'fair', 'quantile', 'mape'):
+        raise TypeError(f"LightGBM amaç fonksiyonu desteklenmiyor: {objective}")
+    builder = _GroupBuilder()
+    for tree in dump['tree_info']:
+        feature, threshold, left, right, value = _flatten_lightgbm_tree(tree['tree_structure'])
+        builder.add_tree(feature, threshold, left, right, value, _tree_depth(left, right))
+    return builder.build(np.float64)
+
+
+def compile_xgboost(model, feature_names=None):
+    """XGBRegressor (veya xgboost.Booster) derler; taban skor ve en iyi iterasyon dikkate alınır."""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+    if learner['gradient_booster']['name'] != 'gbtree':
+        raise TypeError("Yalnızca gbtree XGBoost modelleri desteklenir.")
+    if learner['objective']['name'] not in ('reg:squarederror', 'reg:linear', 'reg:absoluteerror', 'reg:pseudohubererror'):
+        raise TypeError(f"XGBoost amaç fonksiyonu desteklenmiyor: {learner['objective']['name']}")
+    base_score = float(learner['learner_model_param']['base_score'])
+    gbtree = learner['gradient_booster']['model']
+    trees = gbtree['trees']
+
+    best_iteration = getattr(model, 'best_iteration', None) if hasattr(model, 'get_booster') else None
+    if best_iteration is not None:
+        trees = trees[:(int(best_iteration) + 1) * int(gbtree['gbtree_model_param']['num_parallel_tree'])]
+
+    builder = _GroupBuilder()
+    for tree in trees:
+        left = np.array(tree['left_children'])
+        right = np.array(tree['right_children'])
+        conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        if any(tree['split_type']):
+            raise TypeError("XGBoost kategorik bölünmeleri desteklenmez.")
+        # x < t (float32)  <=>  x <= t'nin bir önceki float32 değeri
+        threshold = np.nextafter(conditions, np.float32(-np.inf)).astype(np.float64)
+        # Yaprak düğümlerde split_conditions yaprak değerini taşır
+        value = conditions.astype(np.float64)
+        builder.add_tree(np.array(tree['split_indices']), threshold, left, right, value, _tree_depth(left, right))
+    # XGBoost tahmini float32'de biriktirir: taban skordan başlayıp her ağacın yaprağı sırayla eklenir
+    return builder.build(np.float32, bias=base_score, sum_dtype=np.float32)
+
+
+def compile_estimator(estimator):
+    """Desteklenen bir temel modeli TreeGroup'a derler."""
+    module = type(estimator).__module__
+    if module.startswith('sklearn.') and (hasattr(estimator, 'tree_') or hasattr(estimator, 'estimators_')):
+        return compile_sklearn_forest(estimator)
+    if module.startswith('lightgbm'):
+        return compile_lightgbm(estimator)
+    if module.startswith('xgboost'):
+        return compile_xgboost(estimator)
+    raise TypeError(f"Derlenemeyen model türü: {type(estimator).__name__}")
+
+
+class CompiledStackingRegressor:
+    """Eğitilmiş bir StackingRegressor'ın derlenmiş karşılığı; predict(X) aynı sonuçları döner."""
+
+    def __init__(self, stacking_regressor):
+        self.groups = []
+        self.names = [] # Taban model adları (aşama bazında süre ölçümü için)
+        names = [name for name, estimator in stacking_regressor.estimators if estimator != 'drop']
+        for name, estimator, method in zip(names, stacking_regressor.estimators_, stacking_regressor.stack_method_):
+            if estimator == 'drop':
+                continue
+            if method != 'predict':
+                raise TypeError(f"Desteklenmeyen stack_method: {method}")
+            self.groups.append(compile_estimator(estimator))
+            self.names.append(name)
+        self.passthrough = stacking_regressor.passthrough
+        self.n_features_in_ = stacking_regressor.n_features_in_
+        if hasattr(stacking_regressor, 'feature_names_in_'):
+            self.feature_names_in_ = stacking_regressor.feature_names_in_
+
+        final_estimator = stacking_regressor.final_estimator_
+        self.meta_name = type(final_estimator).__name__
+        if hasattr(final_estimator, 'coef_') and hasattr(final_estimator, 'intercept_'):
+            # Ridge meta-model: tahmin = P @ coef + intercept
+            self.coef = np.asarray(final_estimator.coef_, dtype=np.float64).ravel()
+            self.intercept = float(np.ravel(final_estimator.intercept_)[0])
+            self._final_estimator = None
+        else:
+            self._final_estimator = final_estimator
+
+    def base_predictions(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        return np.column_stack([group.predict(X) for group in self.groups])
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        meta_features = self.base_predictions(X)
+        if self.passthrough:
+            meta_features = np.hstack([meta_features, X])
+        if self._final_estimator is not None:
+            return self._final_estimator.predict(meta_features)
+        return meta_features @ self.coef + self.intercept
+
+
+def compile_stacking(stacking_regressor):
+    return CompiledStackingRegressor(stacking_regressor)
+
+
+def run_benchmark(artifacts, batch_sizes=(1, 100, 100_000), repeat=3):
+    """Orijinal stacking_regressor.predict ile derlenmiş motoru verilen parti boyutlarında karşılaştırır."""
+    import warnings
+    compiled = compile_stacking(artifacts.model)
+    rng = np.random.default_rng(42)
+    results = []
+    for batch_size in batch_sizes:
+        numerical_values = np.column_stack([
+            rng.uniform(0.5, 8.0, batch_size), rng.uniform(110, 135, batch_size), rng.uniform(-5, 40, batch_size),
+            rng.uniform(995, 1035, batch_size), rng.uniform(10, 100, batch_size), rng.uniform(0, 12, batch_size),
+            rng.uniform(0, 360, batch_size),
+        ])
+        descriptions = rng.choice(artifacts.all_descriptions, batch_size)
+        frame = artifacts.encoder.to_frame(artifacts.encoder.encode_arrays(numerical_values, descriptions))
+
+        timings = {}
+        outputs = {}
+        for name, model in (('sklearn', artifacts.model), ('compiled', compiled)):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    outputs[name] = model.predict(frame)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        results.append({
+            'batch_size': batch_size,
+            'sklearn_ms': timings['sklearn'] * 1000,
+            'compiled_ms': timings['compiled'] * 1000,
+            'speedup': timings['sklearn'] / timings['compiled'],
+            'max_abs_diff': float(np.max(np.abs(outputs['sklearn'] - outputs['compiled']))),
+        })
+    return results
+
+
+def main():
+    from model_resources import MODEL_PATH, load_artifacts
+
+    parser = argparse.ArgumentParser(description="Derlenmiş ağaç topluluğu çıkarım motoru")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--model-path', default=MODEL_PATH)
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--batch-sizes', default='1,100,100000')
+    args = parser.parse_args()
+
+    artifacts = load_artifacts(args.base_dir, model_path=args.model_path)
+    compiled = compile_stacking(artifacts.model)
+    print(f"{len(compiled.groups)} temel model, {sum(g.n_trees for g in compiled.groups)} ağaç, "
+          f"{sum(g.n_nodes for g in compiled.groups)} düğüm derlendi.")
+    if args.benchmark:
+        batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+        print(f"{'parti':>8}{'sklearn (ms)':>15}{'derlenmiş (ms)':>17}{'hızlanma':>10}{'maks. fark':>13}")
+        for row in run_benchmark(artifacts, batch_sizes):
+            print(f"{row['batch_size']:>8}{row['sklearn_ms']:>15.2f}{row['compiled_ms']:>17.2f}"
+                  f"{row['speedup']:>9.1f}x{row['max_abs_diff']:>13.2e}")
+
+
+if __name__ == '__main__':
+    main()